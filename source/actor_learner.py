@@ -0,0 +1,160 @@
+import argparse
+import os
+import queue
+import random
+import time
+
+import numpy as np
+import torch
+import torch.multiprocessing as mp
+
+from agent import BATCH_SIZE
+from agent import GAMMA
+from agent import LR
+from agent import MAX_MEMORY
+from agent import explore_mask
+from features import STATE_SIZE
+from features import game_features
+from game import SnakeGameAI
+from model import Linear_QNet
+from model import QTrainer
+from qtable import QTable
+from replay import SharedReplayMemory
+from spectator import Spectator
+from spectator import start_viewer
+from spectator import stop_viewer
+
+ONE_HOT = ([1, 0, 0], [0, 1, 0], [0, 0, 1])
+
+
+def actor(actor_id, memory, q_table, games, steps, results, stop, seed, spectate=None):
+    """Play headless games with greedy moves from the learner's shared ``q_table``, writing transitions to ``memory``.
+
+    ``spectate`` is an optional (viewer queue, every) pair to stream this actor's games to a viewer.
+    """
+    torch.set_num_threads(1)
+    random.seed(seed)
+    np.random.seed(seed)
+    torch.manual_seed(seed)
+
+    memory.shard = actor_id
+    # no Agent: actors never train, so they need the features and the table, not a memory, model or optimizer
+    game = SnakeGameAI(headless=True)
+    if spectate is not None:
+        game.attach(Spectator(*spectate))
+    state_old = game_features(game)
+    state_new = np.empty(STATE_SIZE, dtype=np.float32)
+    n_steps = 0
+    while not stop.is_set():
+        # exploration decays with the games played by all actors, as in Agent.get_actions
+        if explore_mask(games.value, 1)[0]:
+            move = np.random.randint(0, 3)
+        else:
+            move = q_table.act(state_old)
+        reward, done, score = game.play_step(ONE_HOT[move])
+        game_features(game, state_new)
+        memory.push(state_old, move, reward, state_new, done)  # copies both states
+
+        n_steps += 1
+        steps[actor_id] = n_steps
+        if done:
+            game.reset()
+            game_features(game, state_new)
+            with games.get_lock():
+                games.value += 1
+            results.put(score)
+        state_old, state_new = state_new, state_old
+
+
+def train_parallel(actors=None, sync_every=100, max_steps=None, spectate=None):
+    """Run ``actors`` game processes feeding a shared replay memory while this process learns.
+
+    With ``spectate`` set, every ``spectate``-th step of actor 0 is shown in a viewer process.
+    """
+    actors = actors or max(1, os.cpu_count() - 1)
+    ctx = mp.get_context('spawn')
+    torch.set_num_threads(max(1, os.cpu_count() - actors))
+
+    memory = SharedReplayMemory(MAX_MEMORY, STATE_SIZE, shards=actors)
+    model = Linear_QNet(STATE_SIZE, 256, 3)
+    trainer = QTrainer(model, lr=LR, gamma=GAMMA)
+    # greedy actions of every state, in shared memory: a weight sync is one rebuild read by all actors
+    q_table = QTable()
+    q_table.refresh(model)
+
+    games = ctx.Value('q', 0)
+    steps = ctx.Array('q', actors, lock=False)
+    results = ctx.Queue()
+    stop = ctx.Event()
+    viewer_queue = viewer = None
+    if spectate is not None:
+        viewer_queue, viewer = start_viewer(ctx)
+    processes = [ctx.Process(target=actor,
+                             args=(i, memory, q_table, games, steps, results, stop, i,
+                                   (viewer_queue, spectate) if i == 0 and viewer is not None else None),
+                             daemon=True)
+                 for i in range(actors)]
+    for p in processes:
+        p.start()
+
+    n_games = 0
+    record = 0
+    updates = 0
+    last_report = time.perf_counter()
+    last_steps = 0
+    last_updates = 0
+    try:
+        while max_steps is None or sum(steps) < max_steps:
+            if memory.size < BATCH_SIZE:
+                time.sleep(0.01)
+            else:
+                trainer.train_step(*memory.sample(BATCH_SIZE))
+                updates += 1
+                if updates % sync_every == 0:
+                    # actors may read a few entries of the old table mid-rebuild, like a sync one step late
+                    q_table.refresh(model)
+
+            while True:
+                try:
+                    score = results.get_nowait()
+                except queue.Empty:
+                    break
+                n_games += 1
+                if score > record:
+                    record = score
+                    model.save()
+                    print('Game', n_games, 'Score', score, 'Record:', record)
+
+            now = time.perf_counter()
+            if now - last_report >= 5:
+                total_steps = sum(steps)
+                print(f'steps/s: {(total_steps - last_steps) / (now - last_report):.0f}  '
+                      f'updates/s: {(updates - last_updates) / (now - last_report):.1f}  '
+                      f'games: {n_games}  record: {record}')
+                last_report, last_steps, last_updates = now, total_steps, updates
+    except KeyboardInterrupt:
+        pass
+    finally:
+        stop.set()
+        for p in processes:
+            p.join(timeout=5)
+            if p.is_alive():
+                p.terminate()
+        if viewer is not None:
+            stop_viewer(Spectator(viewer_queue), viewer)
+
+    return model
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Train with parallel actor processes and one learner.')
+    parser.add_argument('--actors', type=int, default=None,
+                        help='number of actor processes (default: cpu count - 1)')
+    parser.add_argument('--sync-every', type=int, default=100,
+                        help='learner updates between rebuilds of the Q-table the actors read')
+    parser.add_argument('--steps', type=int, default=None,
+                        help='stop after this many environment steps in total')
+    parser.add_argument('--spectate', nargs='?', type=int, const=10, default=None, metavar='K',
+                        help='show every K-th step (default 10) of one actor in a separate window')
+    args = parser.parse_args()
+    train_parallel(actors=args.actors, sync_every=args.sync_every, max_steps=args.steps, spectate=args.spectate)
@@ -1,171 +1,329 @@
+import argparse
 import os.path
 import random
-from collections import deque
 
 import numpy as np
 import torch
 
-from game import Direction
-from game import Point
+from checkpoint import CheckpointWriter
+from checkpoint import latest_checkpoint
+from checkpoint import load_checkpoint
+from checkpoint import make_checkpoint
+from checkpoint import model_snapshot
+from checkpoint import restore_checkpoint
+from features import REACH_SIZE
+from features import STATE_SIZE
+from features import ReachabilityCache
+from features import game_features
+from features import reachable_features
 from game import SnakeGameAI
-from helper import plot, close_figure
+from helper import start_plotter
+from helper import stop_plotter
+from metrics import Metrics
+from metrics import MetricsLog
+from model import MODEL_DIR
 from model import Linear_QNet
 from model import QTrainer
+from profiler import NULL_PROFILER
+from profiler import Profiler
+from qtable import QTable
+from recording import EpisodeRecorder
+from recording import EpisodeWriter
+from replay import MemmapReplayMemory
+from replay import PrioritizedReplayMemory
+from replay import ReplayMemory
+from spectator import Spectator
+from spectator import start_viewer
+from spectator import stop_viewer
 
 MAX_MEMORY = 100_000
 BATCH_SIZE = 1000
 LR = 0.001
+GAMMA = 0.9  # discount rate
+
+
+def explore_mask(n_games, n):
+    """Which of ``n`` moves are random: epsilon-greedy, epsilon falling from 80/200 to 0 over the first 80 games."""
+    return np.random.randint(0, 201, n) < 80 - n_games
+
+
+def check_agent_options(prioritized=False, extended_state=False, memory_path=None, q_table_every=None,
+                        batch_size=BATCH_SIZE, max_memory=MAX_MEMORY, **_):
+    """Raise ValueError for Agent arguments that cannot be used together."""
+    if prioritized and memory_path:
+        raise ValueError('prioritized replay cannot use an on-disk memory')
+    if extended_state and q_table_every:
+        raise ValueError('the Q-table only covers the 11 binary features')
+    if batch_size < 1 or max_memory < 1:
+        raise ValueError('batch_size and max_memory must be at least 1')
 
 
 class Agent:
 
-    def __init__(self):
+    def __init__(self, prioritized=False, extended_state=False, memory_path=None, q_table_every=None,
+                 lr=LR, gamma=GAMMA, batch_size=BATCH_SIZE, max_memory=MAX_MEMORY, seed=None):
         self.n_games = 0
         self.epsilon = 0  # randomness
-        self.gamma = 0.9  # discount rate
-        self.memory = deque(maxlen=MAX_MEMORY)  # popleft()
-        self.model = Linear_QNet(11, 256, 3)
-        self.trainer = QTrainer(self.model, lr=LR, gamma=self.gamma)
-
-    @staticmethod
-    def get_state(game):
-        head = game.snake[0]
-        point_l = Point(head.x - 20, head.y)
-        point_r = Point(head.x + 20, head.y)
-        point_u = Point(head.x, head.y - 20)
-        point_d = Point(head.x, head.y + 20)
-
-        dir_l = game.direction == Direction.LEFT
-        dir_r = game.direction == Direction.RIGHT
-        dir_u = game.direction == Direction.UP
-        dir_d = game.direction == Direction.DOWN
-
-        state = [
-            # Danger straight
-            (dir_r and game.is_collision(point_r)) or
-            (dir_l and game.is_collision(point_l)) or
-            (dir_u and game.is_collision(point_u)) or
-            (dir_d and game.is_collision(point_d)),
-
-            # Danger right
-            (dir_u and game.is_collision(point_r)) or
-            (dir_d and game.is_collision(point_l)) or
-            (dir_l and game.is_collision(point_u)) or
-            (dir_r and game.is_collision(point_d)),
-
-            # Danger left
-            (dir_d and game.is_collision(point_r)) or
-            (dir_u and game.is_collision(point_l)) or
-            (dir_r and game.is_collision(point_u)) or
-            (dir_l and game.is_collision(point_d)),
-
-            # Move direction
-            dir_l,
-            dir_r,
-            dir_u,
-            dir_d,
-
-            # Food location
-            game.food.x < game.head.x,  # food left
-            game.food.x > game.head.x,  # food right
-            game.food.y < game.head.y,  # food up
-            game.food.y > game.head.y,  # food down
-        ]
-
-        return np.array(state, dtype=int)
+        self.gamma = gamma  # discount rate
+        self.batch_size = batch_size
+        self.extended_state = extended_state  # add free space / tail reachability per move
+        self.state_size = STATE_SIZE + REACH_SIZE if extended_state else STATE_SIZE
+        self.reach_cache = ReachabilityCache() if extended_state else None
+        self.prioritized = prioritized
+        check_agent_options(prioritized, extended_state, memory_path, q_table_every, batch_size, max_memory)
+        if prioritized:
+            self.memory = PrioritizedReplayMemory(max_memory, self.state_size, seed=seed)  # sampled by TD error
+        elif memory_path:
+            self.memory = MemmapReplayMemory(memory_path, max_memory, self.state_size, seed=seed)  # kept across runs
+        else:
+            self.memory = ReplayMemory(max_memory, self.state_size, seed=seed)  # overwrites the oldest when full
+        self.model = Linear_QNet(self.state_size, 256, 3)
+        self.trainer = QTrainer(self.model, lr=lr, gamma=self.gamma)
+        # optional inference-only copy of the model (export.NumpyQNet) that picks the greedy
+        # actions instead of self.model; whoever sets it keeps it in sync with the weights
+        self.policy = None
+        # q_table_every: pick greedy actions from a QTable of every state, rebuilt after that many updates
+        self.q_table_every = q_table_every
+        self.updates = 0  # optimizer steps
+        self._table_updates = None  # self.updates at the last table rebuild
+        if q_table_every:
+            self.policy = QTable()
+
+    def get_state(self, game, out=None):
+        # danger straight/right/left, move direction l/r/u/d, food l/r/u/d as float32
+        if not self.extended_state:
+            return game_features(game, out)
+        if out is None:
+            out = np.empty(self.state_size, dtype=np.float32)
+        game_features(game, out[:STATE_SIZE])
+        reachable_features(game, out[STATE_SIZE:], self.reach_cache)
+        return out
 
     def remember(self, state, action, reward, next_state, done):
-        self.memory.append((state, action, reward, next_state, done))  # popleft if MAX_MEMORY is reached
+        self.memory.push(state, action, reward, next_state, done)  # overwrites the oldest if max_memory is reached
 
     def train_long_memory(self):
-        if len(self.memory) > BATCH_SIZE:
-            mini_sample = random.sample(self.memory, BATCH_SIZE)  # list of tuples
+        if self.prioritized:
+            states, actions, rewards, next_states, dones, idx, weights = self.memory.sample(self.batch_size)
+            td_errors = self.trainer.train_step(states, actions, rewards, next_states, dones, weights)
+            self.memory.update_priorities(idx, td_errors)
         else:
-            mini_sample = self.memory
-
-        states, actions, rewards, next_states, dones = zip(*mini_sample)
-        self.trainer.train_step(states, actions, rewards, next_states, dones)
+            states, actions, rewards, next_states, dones = self.memory.sample(self.batch_size)
+            self.trainer.train_step(states, actions, rewards, next_states, dones)
+        self.updates += 1
 
     def train_short_memory(self, state, action, reward, next_state, done):
         self.trainer.train_step(state, action, reward, next_state, done)
+        self.updates += 1
 
-    def get_action(self, state):
+    def get_actions(self, states):
+        """Action indices (0 straight, 1 right, 2 left) for an (N, state_size) batch of states.
+
+        One forward pass without autograd; epsilon-greedy exploration is drawn per row.
+        """
         # random moves: tradeoff exploration / exploitation
         self.epsilon = 80 - self.n_games
-        final_move = [0, 0, 0]
-        if random.randint(0, 200) < self.epsilon:
-            move = random.randint(0, 2)
-            final_move[move] = 1
+        explore = explore_mask(self.n_games, len(states))
+        if explore.all():
+            return np.random.randint(0, 3, len(states))
+
+        states = np.asarray(states, dtype=np.float32)  # no copy for float32 input
+        if self.q_table_every and (self._table_updates is None
+                                   or self.updates - self._table_updates >= self.q_table_every):
+            self.policy.refresh(self.model)
+            self._table_updates = self.updates
+        if self.policy is not None:
+            actions = self.policy.q_values(states).argmax(axis=1)
         else:
-            state0 = torch.tensor(state, dtype=torch.float)
-            prediction = self.model(state0)
-            move = torch.argmax(prediction).item()
-            final_move[move] = 1
+            with torch.inference_mode():
+                actions = self.model(torch.from_numpy(states)).argmax(dim=1).numpy()
+        if explore.any():
+            actions[explore] = np.random.randint(0, 3, explore.sum())
+        return actions
 
+    def get_action(self, state):
+        move = self.get_actions(np.reshape(state, (1, -1)))[0]
+        final_move = [0, 0, 0]
+        final_move[move] = 1
         return final_move
 
 
-def train():
-    plot_scores = []
-    plot_mean_scores = []
-    total_score = 0
-    record = 0
-    agent = Agent()
+def train(headless=False, prioritized=False, extended_state=False, resume=None, checkpoint_every=50,
+          memory_path=None, profile=None, profile_every=10.0, spectate=None, plot=False, record=None,
+          q_table_every=None, profile_sample=1):
+    metrics = Metrics()
+    agent = Agent(prioritized=prioritized, extended_state=extended_state, memory_path=memory_path,
+                  q_table_every=q_table_every)
     # agent.model.load()
-    if os.path.exists('../models/model_trained.pth'):
-        cp = torch.load('../models/model_trained.pth')
+    trained_path = os.path.join(MODEL_DIR, 'model_trained.pth')
+    if resume == 'latest':
+        resume = latest_checkpoint()
+    if resume:
+        print(f'Resuming: {resume}')
+        stats = restore_checkpoint(agent, load_checkpoint(resume))
+        if 'metrics' in stats:
+            metrics.load_state(stats['metrics'])
+        else:  # written before metrics were kept
+            metrics.load_state({'n_games': agent.n_games, 'total_score': stats.get('total_score', 0),
+                                'record': stats.get('record', 0), 'recent': stats.get('plot_scores', [])})
+    elif os.path.exists(trained_path):
+        cp = torch.load(trained_path)
         agent.model.load_state_dict(cp['model_state_dic'])
         agent.trainer.optimizer.load_state_dict(cp['optim_state_dic'])
         # agent.model.train()
 
-    game = SnakeGameAI()
-    while True:
-        paused, show_plot, show_matplot = game.read_input()
-
-        if paused:
-            continue
-
-        # get old state
-        state_old = agent.get_state(game)
-        # get move
-        final_move = agent.get_action(state_old)
-        # perform move and get new state
-        reward, done, score = game.play_step(final_move)
-        state_new = agent.get_state(game)
-
-        # train short memory
-        agent.train_short_memory(state_old, final_move, reward, state_new, done)
-        # remember
-        agent.remember(state_old, final_move, reward, state_new, done)
-
-        if done:
-            # train long memory, plot result
+    def snapshot():
+        return make_checkpoint(agent, record=metrics.record, metrics=metrics.state())
+
+    writer = CheckpointWriter()
+    # spectate: run headless and show every spectate-th step in a separate viewer process
+    game = SnakeGameAI(headless=headless or spectate is not None)
+    if spectate is not None:
+        viewer_queue, viewer = start_viewer()
+        spectator = Spectator(viewer_queue, every=spectate)
+        game.attach(spectator)
+    # profile: None (off), or a JSONL file ('' to only print summaries)
+    prof = NULL_PROFILER if profile is None else Profiler(profile or None, interval=profile_every,
+                                                         sample_every=profile_sample)
+    if game.renderer is not None:
+        game.renderer.profiler = prof
+        game.update_plot_data(list(metrics.recent))
+    # one line per game, tailed by the plotter process (F2 in the window, or --plot)
+    metrics_path = os.path.join(MODEL_DIR, 'metrics.jsonl')
+    metrics_log = MetricsLog(metrics_path, append=bool(resume))
+    plotter = start_plotter(metrics_path) if plot else None
+    # record: append every game to this file as its board seed and actions
+    recorder = episode_writer = None
+    if record:
+        recorder = EpisodeRecorder()
+        episode_writer = EpisodeWriter(record)
+
+    def new_game():
+        if recorder is None:
             game.reset()
-            agent.n_games += 1
-            agent.train_long_memory()
-
-            if score > record:
-                record = score
-                # agent.model.save()
-                torch.save({'model_state_dic': agent.model.state_dict(),
-                            'optim_state_dic': agent.trainer.optimizer.state_dict()},
-                           '..//models/model.pth')
-
-            print('Game', agent.n_games, 'Score', score, 'Record:', record)
-
-            plot_scores.append(score)
-            total_score += score
-            mean_score = total_score / agent.n_games
-            plot_mean_scores.append(mean_score)
-
-            if show_matplot:
-                plot(plot_scores, plot_mean_scores)
-            else:
-                close_figure()
-
-            if show_plot:
-                game.update_plot_data(plot_scores)
+            return
+        seed = random.getrandbits(64)
+        game.reset(seed=seed)
+        recorder.start(seed, game.w, game.h)
+
+    if recorder is not None:
+        new_game()
+    # two state buffers, swapped every step: the new state becomes the next step's old state
+    state_old = agent.get_state(game, np.empty(agent.state_size, dtype=np.float32))
+    state_new = np.empty(agent.state_size, dtype=np.float32)
+    try:
+        while True:
+            prof.tick()
+            with prof.phase('read_input'):
+                paused, _, show_matplot = game.read_input()
+
+            if paused:
+                continue
+
+            # get move
+            with prof.phase('get_action'):
+                final_move = agent.get_action(state_old)
+            # perform move and get new state
+            with prof.phase('play_step'):
+                reward, done, score = game.play_step(final_move)
+            if recorder is not None:
+                recorder.step(final_move)
+            with prof.phase('get_state'):
+                agent.get_state(game, state_new)
+
+            # train short memory
+            with prof.phase('train_short'):
+                agent.train_short_memory(state_old, final_move, reward, state_new, done)
+            # remember
+            with prof.phase('remember'):
+                agent.remember(state_old, final_move, reward, state_new, done)
+            prof.count('steps')
+            prof.count('updates')
+            # remember copied both states into the memory, so the buffers can be reused
+            state_old, state_new = state_new, state_old
+
+            if done:
+                # train long memory, plot result
+                if recorder is not None:
+                    episode_writer.write(recorder.finish(score))
+                new_game()
+                with prof.phase('get_state'):
+                    agent.get_state(game, state_old)
+                agent.n_games += 1
+                with prof.phase('train_long'):
+                    agent.train_long_memory()
+                prof.count('updates')
+                prof.count('games')
+
+                print('Game', agent.n_games, 'Score', score, 'Record:', max(score, metrics.record))
+
+                new_record = score > metrics.record
+                with prof.phase('plot'):
+                    metrics_log.write(metrics.add(score))
+                    game.add_plot_score(score)
+                    if (plot or show_matplot) != (plotter is not None):
+                        if plotter is None:
+                            plotter = start_plotter(metrics_path)
+                        else:
+                            stop_plotter(plotter)
+                            plotter = None
+
+                with prof.phase('checkpoint'):
+                    if new_record:
+                        # weights only, like Linear_QNet.save: the best model, not a checkpoint
+                        writer.save(model_snapshot(agent.model), 'model.pth')
+                    if agent.n_games % checkpoint_every == 0:
+                        writer.save(snapshot())
+    except KeyboardInterrupt:
+        pass
+    finally:
+        writer.save(snapshot())
+        writer.close()
+        prof.close()
+        metrics_log.close()
+        if episode_writer is not None:
+            episode_writer.close()
+        stop_plotter(plotter)
+        if spectate is not None:
+            stop_viewer(spectator, viewer)
+        if memory_path:
+            agent.memory.flush()
 
 
 if __name__ == '__main__':
-    train()
+    parser = argparse.ArgumentParser(description='Train the snake agent.')
+    parser.add_argument('--headless', action='store_true',
+                        help='run without a pygame window or frame rate limit')
+    parser.add_argument('--prioritized', action='store_true',
+                        help='sample long memory batches by TD error (prioritized replay)')
+    parser.add_argument('--extended-state', action='store_true',
+                        help='add reachable space and tail reachability for each move to the state')
+    parser.add_argument('--resume', nargs='?', const='latest', default=None, metavar='CHECKPOINT',
+                        help='resume from a checkpoint (default: the newest one in models/)')
+    parser.add_argument('--checkpoint-every', type=int, default=50,
+                        help='games between rotated checkpoints')
+    parser.add_argument('--memory', default=None, metavar='DIR',
+                        help='keep the replay memory in memory-mapped files in DIR and reuse it on restart')
+    parser.add_argument('--profile', nargs='?', const=os.path.join(MODEL_DIR, 'profile.jsonl'), default=None,
+                        metavar='FILE', help='time each phase of the loop and append summaries to FILE as JSON lines '
+                                             '(default: models/profile.jsonl)')
+    parser.add_argument('--record', nargs='?', const=os.path.join(MODEL_DIR, 'episodes.bin'), default=None,
+                        metavar='FILE', help='append every game to FILE as its seed and actions, for recording.py '
+                                             'to replay (default: models/episodes.bin)')
+    parser.add_argument('--plot', action='store_true',
+                        help='plot scores in a separate window (F2 in the game window does the same)')
+    parser.add_argument('--spectate', nargs='?', type=int, const=10, default=None, metavar='K',
+                        help='train headless and show every K-th step (default 10) and replays of record games '
+                             'in a separate window that never slows training down')
+    parser.add_argument('--profile-every', type=float, default=10.0, metavar='SECONDS',
+                        help='seconds between profile summaries')
+    parser.add_argument('--profile-sample', type=int, default=1, metavar='N',
+                        help='time only one loop iteration in N, to keep profiling overhead low (default: every one)')
+    parser.add_argument('--q-table', nargs='?', type=int, const=100, default=None, metavar='K',
+                        help='pick moves from a table of all 2048 states, rebuilt every K updates (default 100)')
+    args = parser.parse_args()
+    train(headless=args.headless, prioritized=args.prioritized, extended_state=args.extended_state,
+          resume=args.resume, checkpoint_every=args.checkpoint_every, memory_path=args.memory,
+          profile=args.profile, profile_every=args.profile_every, spectate=args.spectate,
+          plot=args.plot, record=args.record, q_table_every=args.q_table,
+          profile_sample=args.profile_sample)
@@ -0,0 +1,201 @@
+import argparse
+import json
+import platform
+import random
+import sys
+import time
+
+import numpy as np
+import torch
+
+from agent import Agent
+from agent import BATCH_SIZE
+from agent import MAX_MEMORY
+from game import BLOCK_SIZE
+from game import CLOCK_WISE
+from game import Point
+from game import SnakeGameAI
+from model import Linear_QNet
+from model import QTrainer
+from replay import PrioritizedReplayMemory
+from replay import ReplayMemory
+
+BOARDS = [(320, 240), (640, 480), (1280, 760)]
+LENGTHS = [3, 50, 500]
+SEED = 1234
+
+# change of direction index -> one-hot [straight, right, left]
+TURN_ACTIONS = {0: [1, 0, 0], 1: [0, 1, 0], 3: [0, 0, 1]}
+
+
+def seed_all(seed=SEED):
+    random.seed(seed)
+    np.random.seed(seed)
+    torch.manual_seed(seed)
+
+
+def measure(func, min_time=0.2, repeat=3):
+    """Best-of-``repeat`` calls per second of ``func``, each round running for at least ``min_time``."""
+    func()  # warm up: lazy init, allocator, caches
+    best = 0.0
+    for _ in range(repeat):
+        n = 0
+        start = time.perf_counter()
+        elapsed = 0.0
+        while elapsed < min_time:
+            func()
+            n += 1
+            elapsed = time.perf_counter() - start
+        best = max(best, n / elapsed)
+    return best
+
+
+def hamiltonian_cycle(cols, rows):
+    """Cells (x, y) of a closed path over the whole board; ``rows`` must be even."""
+    cycle = [(x, 0) for x in range(cols)]
+    for y in range(1, rows):
+        xs = range(cols - 1, 0, -1) if y % 2 else range(1, cols)
+        cycle += [(x, y) for x in xs]
+    cycle += [(0, y) for y in range(rows - 1, 0, -1)]
+    return cycle
+
+
+def looped_game(w, h, length):
+    """Headless game with a ``length`` long snake laid along a cycle, plus its start body and the moves that keep it going round."""
+    game = SnakeGameAI(w=w, h=h, headless=True)
+    cycle = hamiltonian_cycle(game.cols, game.rows)
+    length = min(length, len(cycle) - 1)
+    body = cycle[length - 1::-1]  # head first
+    directions = []
+    for (x0, y0), (x1, y1) in zip(cycle, cycle[1:] + cycle[:1]):
+        directions.append([(1, 0), (0, 1), (-1, 0), (0, -1)].index((x1 - x0, y1 - y0)))
+    snake = [Point(x * BLOCK_SIZE, y * BLOCK_SIZE) for x, y in body]
+    game.set_snake(snake, CLOCK_WISE[directions[length - 2]])
+    # actions[i] moves the head from cycle[i] to cycle[i + 1]
+    actions = [TURN_ACTIONS[(directions[i] - directions[i - 1]) % 4] for i in range(len(cycle))]
+    return game, snake, actions
+
+
+def bench_play_step(w, h, length):
+    game, snake, actions = looped_game(w, h, length)
+    direction = game.direction
+    state = {'i': len(snake) - 2}
+
+    def step():
+        i = state['i'] = (state['i'] + 1) % len(actions)
+        game.frame_iterations = 0  # going round the loop would otherwise time out
+        if game.play_step(actions[i])[1]:
+            # the snake has grown to fill the board: start over from the same position
+            game.set_snake(snake, direction)
+            state['i'] = len(snake) - 2
+    return step
+
+
+def bench_get_state(w, h, length, extended_state=False):
+    game = looped_game(w, h, length)[0]
+    agent = Agent(extended_state=extended_state)
+    agent.reach_cache = None  # the state never changes here, so a cache would only measure lookups
+    out = np.empty(agent.state_size, dtype=np.float32)
+    return lambda: agent.get_state(game, out)
+
+
+def bench_place_food(w, h, length):
+    game = looped_game(w, h, length)[0]
+    return game._place_food
+
+
+def bench_train_step(batch_size):
+    model = Linear_QNet(11, 256, 3)
+    trainer = QTrainer(model, lr=0.001, gamma=0.9)
+    memory = ReplayMemory(batch_size, 11)
+    for _ in range(batch_size):
+        memory.push(np.random.randint(0, 2, 11), np.random.randint(0, 3), np.random.choice([0, 10, -9]),
+                    np.random.randint(0, 2, 11), np.random.rand() < 0.05)
+    batch = tuple(t.clone() for t in memory.gather(np.arange(batch_size)))
+    if batch_size == 1:
+        batch = tuple(t[0] for t in batch)
+    return lambda: trainer.train_step(*batch)
+
+
+def bench_sample(prioritized):
+    memory = PrioritizedReplayMemory(MAX_MEMORY, 11) if prioritized else ReplayMemory(MAX_MEMORY, 11)
+    state = np.zeros(11)
+    for i in range(MAX_MEMORY):
+        memory.push(state, i % 3, 0, state, False)
+    if not prioritized:
+        return lambda: memory.sample(BATCH_SIZE)
+
+    td_errors = np.random.rand(BATCH_SIZE)
+
+    def sample_and_update():
+        idx = memory.sample(BATCH_SIZE)[5]
+        memory.update_priorities(idx, td_errors)
+    return sample_and_update
+
+
+def cases(quick=False):
+    """(name, params, factory) for every benchmark; ``quick`` keeps only the default board."""
+    boards = BOARDS[-1:] if quick else BOARDS
+    for w, h in boards:
+        for length in LENGTHS:
+            params = {'w': w, 'h': h, 'length': length}
+            yield 'play_step', params, lambda p=params: bench_play_step(**p)
+            yield 'get_state', params, lambda p=params: bench_get_state(**p)
+            yield 'get_state_extended', params, lambda p=params: bench_get_state(**p, extended_state=True)
+            yield '_place_food', params, lambda p=params: bench_place_food(**p)
+    for batch_size in (1, BATCH_SIZE):
+        yield 'train_step', {'batch_size': batch_size}, lambda b=batch_size: bench_train_step(b)
+    for prioritized in (False, True):
+        yield 'sample', {'prioritized': prioritized}, lambda p=prioritized: bench_sample(p)
+
+
+def run(quick=False, min_time=0.2, repeat=3):
+    results = []
+    for name, params, factory in cases(quick):
+        seed_all()
+        func = factory()
+        ops = measure(func, min_time=min_time, repeat=repeat)
+        results.append({'name': name, 'params': params, 'ops_per_sec': ops, 'us_per_op': 1e6 / ops})
+        print(f'{name:20} {json.dumps(params):45} {ops:12.0f} ops/s {1e6 / ops:10.2f} us')
+    return {'meta': {'python': platform.python_version(), 'numpy': np.__version__, 'torch': torch.__version__,
+                     'machine': platform.machine(), 'processor': platform.processor(), 'seed': SEED,
+                     'torch_threads': torch.get_num_threads()},
+            'results': results}
+
+
+def compare(results, baseline, tolerance=0.2):
+    """Results more than ``tolerance`` slower than the baseline, as (name, params, ratio)."""
+    def key(r):
+        return r['name'], json.dumps(r['params'], sort_keys=True)
+    base = {key(r): r['ops_per_sec'] for r in baseline['results']}
+    regressions = []
+    for r in results['results']:
+        if key(r) in base:
+            ratio = r['ops_per_sec'] / base[key(r)]
+            if ratio < 1 - tolerance:
+                regressions.append((r['name'], r['params'], ratio))
+    return regressions
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Benchmark the training hot paths.')
+    parser.add_argument('--quick', action='store_true', help='only the default board size')
+    parser.add_argument('--min-time', type=float, default=0.2, help='seconds per measurement round')
+    parser.add_argument('--repeat', type=int, default=3, help='rounds per benchmark, the best is kept')
+    parser.add_argument('--output', default=None, help='write the results as JSON to this file')
+    parser.add_argument('--baseline', default=None, help='JSON results to compare against')
+    parser.add_argument('--tolerance', type=float, default=0.2,
+                        help='slowdown against the baseline that counts as a regression')
+    args = parser.parse_args()
+
+    torch.set_num_threads(1)
+    report = run(quick=args.quick, min_time=args.min_time, repeat=args.repeat)
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2)
+    if args.baseline:
+        with open(args.baseline) as f:
+            regressions = compare(report, json.load(f), args.tolerance)
+        for name, params, ratio in regressions:
+            print(f'REGRESSION {name} {json.dumps(params)}: {ratio:.2f}x baseline')
+        sys.exit(1 if regressions else 0)
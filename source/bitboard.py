@@ -0,0 +1,211 @@
+import random
+from functools import lru_cache
+
+import numpy as np
+
+from game import ATE_FOOD
+from game import CLOCK_WISE
+from game import HIT_WALL
+
+# Boards are packed into Python ints: bit y * cols + x is cell (x, y).
+
+MASK64 = (1 << 64) - 1
+
+
+def splitmix64(state):
+    """One splitmix64 step: (next state, 64-bit random output)."""
+    state = (state + 0x9E3779B97F4A7C15) & MASK64
+    z = ((state ^ (state >> 30)) * 0xBF58476D1CE4E5B9) & MASK64
+    z = ((z ^ (z >> 27)) * 0x94D049BB133111EB) & MASK64
+    return state, z ^ (z >> 31)
+
+
+@lru_cache(maxsize=None)
+def board_masks(cols, rows):
+    """(full, not_first_col, not_last_col) masks for a cols x rows board."""
+    full = (1 << (cols * rows)) - 1
+    first_col = 0
+    for y in range(rows):
+        first_col |= 1 << (y * cols)
+    last_col = first_col << (cols - 1)
+    return full, full & ~first_col, full & ~last_col
+
+
+def mask_from_grid(grid):
+    """Bitboard of the non-zero cells of a row-major byte grid (e.g. SnakeGameAI.grid)."""
+    bits = np.packbits(np.frombuffer(grid, dtype=np.uint8) != 0, bitorder='little')
+    return int.from_bytes(bits.tobytes(), 'little')
+
+
+def grow(region, cols, rows):
+    """``region`` plus every cell next to it."""
+    full, not_first_col, not_last_col = board_masks(cols, rows)
+    return (region
+            | ((region << 1) & not_first_col)  # right
+            | ((region >> 1) & not_last_col)  # left
+            | ((region << cols) & full)  # down
+            | (region >> cols))  # up
+
+
+def flood_fill(seed, free, cols, rows):
+    """All cells of ``free`` connected to the ``seed`` bits, one ring of neighbours per pass."""
+    region = seed & free
+    while True:
+        grown = grow(region, cols, rows) & free
+        if grown == region:
+            return region
+        region = grown
+
+
+@lru_cache(maxsize=None)
+def edge_masks(cols, rows):
+    """Per direction index (right, down, left, up): the cells a move in that direction leaves the board from."""
+    full, not_first_col, not_last_col = board_masks(cols, rows)
+    last_row = ((1 << cols) - 1) << (cols * (rows - 1))
+    first_row = (1 << cols) - 1
+    return full & ~not_last_col, last_row, full & ~not_first_col, first_row
+
+
+class BitboardSnake:
+    """Snake game state packed into a handful of ints, for search and cheap cloning.
+
+    ``body`` is the bitboard of body cells, ``head``/``tail``/``food`` are cell
+    indices and ``trail`` holds 2 bits per body link, tail first: the direction
+    index from that segment to the next one towards the head. Directions follow
+    game.CLOCK_WISE. play_step keeps SnakeGameAI's rewards and game over rules.
+    Food is drawn by a splitmix64 generator whose whole state is the 64-bit
+    ``rng`` int, so a copy carries its own stream at the cost of one int.
+    A state is a few hundred bytes on a 64 x 38 board and ``copy`` is O(1).
+    """
+    __slots__ = ('cols', 'rows', 'body', 'head', 'tail', 'trail', 'length', 'direction',
+                 'food', 'score', 'frame_iterations', 'rng')
+
+    def __init__(self, cols, rows, seed=None):
+        self.cols = cols
+        self.rows = rows
+        self.rng = random.getrandbits(64) if seed is None else seed & MASK64
+        self.reset()
+
+    def reset(self):
+        # same start as SnakeGameAI.reset: head in the middle, moving right, 3 long
+        cols = self.cols
+        self.head = (self.rows // 2) * cols + cols // 2
+        self.tail = self.head - 2
+        self.body = 0b111 << self.tail
+        self.trail = 0b0000  # two links, both pointing right
+        self.length = 3
+        self.direction = 0
+        self.score = 0
+        self.frame_iterations = 0
+        self.food = -1
+        self._place_food()
+
+    @classmethod
+    def from_game(cls, game, seed=None):
+        """Bitboard copy of a running SnakeGameAI."""
+        state = cls.__new__(cls)
+        state.cols = game.cols
+        state.rows = game.rows
+        state.rng = random.getrandbits(64) if seed is None else seed & MASK64
+        cells = [game._cell(pt) for pt in game.snake]
+        state.head = cells[0]
+        state.tail = cells[-1]
+        state.body = mask_from_grid(game.grid)
+        steps = cls._steps(game.cols)
+        state.trail = 0
+        for i, (nxt, prev) in enumerate(zip(cells[-2::-1], cells[::-1])):
+            state.trail |= steps.index(nxt - prev) << (2 * i)
+        state.length = len(cells)
+        state.direction = CLOCK_WISE.index(game.direction)
+        state.food = game._cell(game.food)
+        state.score = game.score
+        state.frame_iterations = game.frame_iterations
+        return state
+
+    def copy(self):
+        """Independent clone: it draws the same food as this state would, without advancing this state's RNG."""
+        state = BitboardSnake.__new__(BitboardSnake)
+        for name in BitboardSnake.__slots__:
+            setattr(state, name, getattr(self, name))
+        return state
+
+    @staticmethod
+    def _steps(cols):
+        # cell index change per direction index
+        return 1, cols, -1, -cols
+
+    def _randrange(self, n):
+        # modulo bias is below n / 2**64, far too small to matter for board sizes
+        self.rng, r = splitmix64(self.rng)
+        return r % n
+
+    def _place_food(self) -> bool:
+        # uniform draw from the free cells; False when the snake fills the board
+        free = board_masks(self.cols, self.rows)[0] & ~self.body
+        if not free:
+            return False
+        cells = self.cols * self.rows
+        for _ in range(8):
+            cell = self._randrange(cells)
+            if free >> cell & 1:
+                self.food = cell
+                return True
+        # crowded board: pick the n-th free cell directly
+        n = self._randrange(free.bit_count())
+        bits = bin(free)[:1:-1]  # bit 0 first
+        self.food = [i for i, b in enumerate(bits) if b == '1'][n]
+        return True
+
+    def move_bits(self, direction):
+        """Bit of the cell one step from the head in ``direction``, 0 if that leaves the board."""
+        head_bit = 1 << self.head
+        if edge_masks(self.cols, self.rows)[direction] & head_bit:
+            return 0
+        return 1 << (self.head + self._steps(self.cols)[direction])
+
+    def danger(self):
+        """(straight, right, left): whether that move ends the game, as in Agent.get_state."""
+        d = self.direction
+        return tuple(not self.move_bits(nd) or bool(self.move_bits(nd) & self.body)
+                     for nd in (d, (d + 1) % 4, (d - 1) % 4))
+
+    def reachable(self, steps=None):
+        """Free cells the head can get to in at most ``steps`` moves (no limit if None)."""
+        free = board_masks(self.cols, self.rows)[0] & ~self.body
+        region = grow(1 << self.head, self.cols, self.rows) & free
+        if steps is None:
+            return flood_fill(region, free, self.cols, self.rows)
+        for _ in range(steps - 1):
+            region = grow(region, self.cols, self.rows) & free
+        return region
+
+    def play_step(self, action):
+        """Same contract as SnakeGameAI.play_step; ``action`` is one-hot or an index."""
+        self.frame_iterations += 1
+
+        turn = int(action) if np.ndim(action) == 0 else int(np.argmax(action))
+        self.direction = (self.direction + (0, 1, -1)[turn]) % 4
+        new_bit = self.move_bits(self.direction)
+
+        # check if game over; the tail has not moved yet, as in play_step
+        if not new_bit or new_bit & self.body or self.frame_iterations > 100 * (self.length + 1):
+            return HIT_WALL, True, self.score
+
+        # move the head
+        self.head += self._steps(self.cols)[self.direction]
+        self.body |= new_bit
+        self.trail |= self.direction << (2 * (self.length - 1))
+        self.length += 1
+
+        # place new food or just move
+        if self.head == self.food:
+            self.score += 1
+            if not self._place_food():
+                return ATE_FOOD, True, self.score
+            return ATE_FOOD, False, self.score
+
+        self.body &= ~(1 << self.tail)
+        self.tail += self._steps(self.cols)[self.trail & 3]
+        self.trail >>= 2
+        self.length -= 1
+        return 0, False, self.score
@@ -0,0 +1,136 @@
+import copy
+import glob
+import os
+import random
+import threading
+
+import numpy as np
+import torch
+
+from model import MODEL_DIR
+
+CHECKPOINT_PATTERN = 'checkpoint_*.pth'
+
+
+def model_snapshot(model):
+    """Cloned weights of ``model``: the models/model.pth layout, as written by Linear_QNet.save."""
+    return {k: v.detach().clone() for k, v in model.state_dict().items()}
+
+
+def make_checkpoint(agent, **stats):
+    """Snapshot of everything needed to resume training, safe to write from another thread.
+
+    Tensors are cloned so training can go on while the snapshot is written.
+    ``stats`` holds the train loop's own state (record, scores, ...).
+    """
+    return {
+        'model_state_dic': model_snapshot(agent.model),
+        'optim_state_dic': copy.deepcopy(agent.trainer.optimizer.state_dict()),
+        'n_games': agent.n_games,
+        'rng_state': {'random': random.getstate(),
+                      'numpy': np.random.get_state(),
+                      'torch': torch.get_rng_state()},
+        'stats': copy.deepcopy(stats),
+    }
+
+
+def restore_checkpoint(agent, checkpoint):
+    """Load a checkpoint into ``agent`` and the global RNGs; returns the saved train loop stats."""
+    agent.model.load_state_dict(checkpoint['model_state_dic'])
+    agent.trainer.optimizer.load_state_dict(checkpoint['optim_state_dic'])
+    agent.n_games = checkpoint.get('n_games', 0)
+    rng_state = checkpoint.get('rng_state')
+    if rng_state is not None:
+        random.setstate(rng_state['random'])
+        np.random.set_state(rng_state['numpy'])
+        torch.set_rng_state(rng_state['torch'])
+    return checkpoint.get('stats', {})
+
+
+def latest_checkpoint(folder=MODEL_DIR):
+    """Path of the newest rotated checkpoint in ``folder``, or None."""
+    paths = sorted(glob.glob(os.path.join(folder, CHECKPOINT_PATTERN)))
+    return paths[-1] if paths else None
+
+
+def load_checkpoint(path):
+    # checkpoints hold numpy RNG state and plain python stats, not just tensors
+    return torch.load(path, weights_only=False)
+
+
+class CheckpointWriter:
+    """Writes checkpoints on a background thread so the train loop never waits on disk.
+
+    Only the newest pending snapshot per file is kept: if training produces
+    checkpoints faster than they can be written, older unwritten ones are
+    dropped. Files are written to a temporary name and renamed into place, so a
+    crash never leaves a half-written checkpoint. Rotated checkpoints
+    (``name=None``) are numbered by game and only the newest ``keep`` are kept.
+    """
+
+    def __init__(self, folder=MODEL_DIR, keep=3):
+        self.folder = folder
+        self.keep = keep
+        self._pending = {}
+        self._cond = threading.Condition()
+        self._closed = False
+        self._busy = False
+        os.makedirs(folder, exist_ok=True)
+        self._thread = threading.Thread(target=self._run, name='checkpoint-writer', daemon=True)
+        self._thread.start()
+
+    def save(self, checkpoint, name=None):
+        """Queue ``checkpoint`` to be written to ``name`` (a rotated checkpoint if None)."""
+        rotate = name is None
+        if rotate:
+            name = CHECKPOINT_PATTERN.replace('*', f'{checkpoint["n_games"]:09d}')
+        with self._cond:
+            self._pending[name] = (checkpoint, rotate)
+            self._cond.notify()
+
+    def flush(self):
+        """Block until every queued checkpoint is on disk."""
+        with self._cond:
+            self._cond.wait_for(lambda: not self._pending and not self._busy)
+
+    def close(self):
+        self.flush()
+        with self._cond:
+            self._closed = True
+            self._cond.notify()
+        self._thread.join()
+
+    def _run(self):
+        while True:
+            with self._cond:
+                self._cond.wait_for(lambda: self._pending or self._closed)
+                if not self._pending:
+                    return
+                name, (checkpoint, rotate) = self._pending.popitem()
+                self._busy = True
+            try:
+                self._write(name, checkpoint, rotate)
+            except Exception as e:  # torch.save raises RuntimeError on a full disk; keep serving later saves
+                print(f'Checkpoint {name} not saved: {type(e).__name__}: {e}')
+            finally:
+                with self._cond:
+                    self._busy = False
+                    self._cond.notify_all()
+
+    def _write(self, name, checkpoint, rotate):
+        path = os.path.join(self.folder, name)
+        tmp_path = path + '.tmp'
+        try:
+            with open(tmp_path, 'wb') as f:
+                torch.save(checkpoint, f)
+                f.flush()
+                os.fsync(f.fileno())
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+        os.replace(tmp_path, path)
+
+        if rotate:
+            for old in sorted(glob.glob(os.path.join(self.folder, CHECKPOINT_PATTERN)))[:-self.keep]:
+                os.remove(old)
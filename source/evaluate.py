@@ -0,0 +1,121 @@
+import argparse
+import json
+import multiprocessing as mp
+import os
+import time
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import torch
+
+from features import REACH_SIZE
+from features import STATE_SIZE
+from features import ReachabilityCache
+from features import game_features
+from features import reachable_features
+from export import load_policy
+from game import SnakeGameAI
+from model import MODEL_DIR
+
+PERCENTILES = (10, 25, 50, 75, 90, 99)
+
+# per worker process, set by _init_worker
+_policy = None
+
+
+def _init_worker(path):
+    global _policy
+    torch.set_num_threads(1)
+    _policy = load_policy(path)
+
+
+def play_episode(policy, seed, w=1280, h=760, cache=None):
+    """One greedy game on a seeded headless board; returns its seed, score, steps and death cause.
+
+    ``policy`` is an export.py policy (NumpyQNet, TorchPolicy); its input size
+    tells whether the game is played with the extended state.
+    """
+    extended_state = policy.in_features == STATE_SIZE + REACH_SIZE
+    game = SnakeGameAI(w=w, h=h, headless=True, seed=seed)
+    state = np.empty(policy.in_features, dtype=np.float32)
+    action = [0, 0, 0]
+    steps = 0
+    done = False
+    while not done:
+        game_features(game, state[:STATE_SIZE])
+        if extended_state:
+            reachable_features(game, state[STATE_SIZE:], cache)
+        action[0] = action[1] = action[2] = 0
+        action[policy.act(state)] = 1
+        _, done, score = game.play_step(action)
+        steps += 1
+    return {'seed': seed, 'score': score, 'steps': steps, 'death': game.death}
+
+
+def _play_episodes(seeds, w, h):
+    cache = ReachabilityCache() if _policy.in_features == STATE_SIZE + REACH_SIZE else None
+    return [play_episode(_policy, seed, w, h, cache) for seed in seeds]
+
+
+def summarize(values):
+    values = np.asarray(values)
+    stats = {'mean': float(values.mean()), 'std': float(values.std()),
+             'min': int(values.min()), 'max': int(values.max())}
+    for q, v in zip(PERCENTILES, np.percentile(values, PERCENTILES)):
+        stats[f'p{q}'] = float(v)
+    return stats
+
+
+def evaluate(path=os.path.join(MODEL_DIR, 'model.pth'), episodes=1000, workers=None, seed=0, w=1280, h=760,
+             chunk_size=None):
+    """Play ``episodes`` greedy games with the model at ``path`` over a process pool.
+
+    ``path`` is a model or checkpoint file, or an artifact from export.py.
+    Episode i uses board seed ``seed + i``, so results do not depend on the
+    number of workers. Returns the report as a dict; ``episodes`` in it lists
+    every game.
+    """
+    workers = workers or os.cpu_count()
+    seeds = list(range(seed, seed + episodes))
+    chunk_size = chunk_size or max(1, episodes // (workers * 4))
+    chunks = [seeds[i:i + chunk_size] for i in range(0, episodes, chunk_size)]
+
+    start = time.perf_counter()
+    with ProcessPoolExecutor(workers, mp_context=mp.get_context('spawn'), initializer=_init_worker,
+                             initargs=(path,)) as pool:
+        results = [r for chunk in pool.map(_play_episodes, chunks, [w] * len(chunks), [h] * len(chunks))
+                   for r in chunk]
+    elapsed = time.perf_counter() - start
+
+    return {
+        'checkpoint': os.path.abspath(path),
+        'board': [w, h],
+        'seed': seed,
+        'n_episodes': episodes,
+        'score': summarize([r['score'] for r in results]),
+        'steps': summarize([r['steps'] for r in results]),
+        'deaths': dict(Counter(r['death'] for r in results)),
+        'elapsed': elapsed,
+        'episodes_per_sec': episodes / elapsed,
+        'episodes': results,
+    }
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Play greedy games with a saved model and report the scores.')
+    parser.add_argument('checkpoint', nargs='?', default=os.path.join(MODEL_DIR, 'model.pth'),
+                        help='model, checkpoint or exported .npz/.pt file (default: models/model.pth)')
+    parser.add_argument('--episodes', type=int, default=1000, help='games to play')
+    parser.add_argument('--workers', type=int, default=None, help='worker processes (default: cpu count)')
+    parser.add_argument('--seed', type=int, default=0, help='board seed of the first game')
+    parser.add_argument('--size', type=int, nargs=2, default=(1280, 760), metavar=('W', 'H'), help='board size')
+    parser.add_argument('--output', default=None, help='write the full report, with every game, to this file')
+    args = parser.parse_args()
+
+    report = evaluate(args.checkpoint, episodes=args.episodes, workers=args.workers, seed=args.seed,
+                      w=args.size[0], h=args.size[1])
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2)
+    print(json.dumps({k: v for k, v in report.items() if k != 'episodes'}, indent=2))
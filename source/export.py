@@ -0,0 +1,175 @@
+import argparse
+import itertools
+import os
+import sys
+import warnings
+from contextlib import contextmanager
+
+import numpy as np
+import torch
+import torch.nn as nn
+
+from features import STATE_SIZE
+from model import MODEL_DIR
+from model import Linear_QNet
+from model import load_weights
+
+# export kinds and the file suffix of each artifact
+KINDS = {'numpy': '.npz', 'torchscript': '.pt', 'quantized': '.int8.pt'}
+
+
+class NumpyQNet:
+    """Linear_QNet forward pass in plain NumPy, without any torch dispatch overhead.
+
+    Same float32 math as the torch model; a single state takes a few microseconds.
+    """
+
+    def __init__(self, w1, b1, w2, b2):
+        self.w1 = np.ascontiguousarray(w1, dtype=np.float32)
+        self.b1 = np.ascontiguousarray(b1, dtype=np.float32)
+        self.w2 = np.ascontiguousarray(w2, dtype=np.float32)
+        self.b2 = np.ascontiguousarray(b2, dtype=np.float32)
+
+    @classmethod
+    def from_state_dict(cls, state_dict):
+        return cls(*(state_dict[k].detach().cpu().numpy() for k in
+                     ('linear1.weight', 'linear1.bias', 'linear2.weight', 'linear2.bias')))
+
+    @classmethod
+    def load(cls, path):
+        with np.load(path) as data:
+            return cls(data['w1'], data['b1'], data['w2'], data['b2'])
+
+    def save(self, path):
+        with open(path, 'wb') as f:
+            np.savez(f, w1=self.w1, b1=self.b1, w2=self.w2, b2=self.b2)
+
+    @property
+    def in_features(self):
+        return self.w1.shape[1]
+
+    def q_values(self, states):
+        """(N, 3) Q-values for an (N, in_features) batch of states."""
+        hidden = np.asarray(states, dtype=np.float32) @ self.w1.T
+        hidden += self.b1
+        np.maximum(hidden, 0, out=hidden)
+        return hidden @ self.w2.T + self.b2
+
+    def act(self, state):
+        """Greedy action index for one state."""
+        hidden = np.dot(self.w1, state)
+        hidden += self.b1
+        np.maximum(hidden, 0, out=hidden)
+        q = np.dot(self.w2, hidden)
+        q += self.b2
+        return int(q.argmax())
+
+
+class TorchPolicy:
+    """The NumpyQNet interface over a torch module: eager, TorchScript or quantized."""
+
+    def __init__(self, module, in_features):
+        self.module = module
+        self.in_features = in_features
+
+    def q_values(self, states):
+        states = torch.from_numpy(np.asarray(states, dtype=np.float32))
+        with torch.inference_mode():
+            return self.module(states).numpy()
+
+    def act(self, state):
+        return int(self.q_values(np.reshape(state, (1, -1)))[0].argmax())
+
+
+@contextmanager
+def _quiet_jit():
+    # jit/ao are flagged as deprecated in recent torch releases but are still the way to get a frozen CPU graph
+    with warnings.catch_warnings():
+        for category in (FutureWarning, DeprecationWarning, UserWarning):
+            warnings.simplefilter('ignore', category)
+        yield
+
+
+def export(state_dict, path, kind='numpy'):
+    """Write an inference-only copy of the model in ``state_dict`` to ``path``; returns its policy."""
+    if kind == 'numpy':
+        policy = NumpyQNet.from_state_dict(state_dict)
+        policy.save(path)
+        return policy
+
+    model = Linear_QNet.from_state_dict(state_dict).eval()
+    in_features = model.linear1.in_features
+    with _quiet_jit():
+        if kind == 'quantized':
+            model = torch.ao.quantization.quantize_dynamic(model, {nn.Linear}, dtype=torch.qint8)
+        elif kind != 'torchscript':
+            raise ValueError(f'unknown export kind {kind!r}, expected one of {sorted(KINDS)}')
+        module = torch.jit.freeze(torch.jit.script(model))
+        if kind == 'torchscript':
+            module = torch.jit.optimize_for_inference(module)
+        # frozen graphs keep no parameters to read the input size from
+        torch.jit.save(module, path, _extra_files={'in_features': str(in_features)})
+    return TorchPolicy(module, in_features)
+
+
+def load_policy(path):
+    """Policy for an exported artifact (.npz or TorchScript) or a model/checkpoint file.
+
+    Float weights from a model or checkpoint file are served by NumpyQNet.
+    """
+    if path.endswith('.npz'):
+        return NumpyQNet.load(path)
+    extra = {'in_features': ''}
+    try:
+        with _quiet_jit():
+            module = torch.jit.load(path, map_location='cpu', _extra_files=extra)
+    except RuntimeError:  # not TorchScript: a state dict or training checkpoint
+        return NumpyQNet.from_state_dict(load_weights(path))
+    return TorchPolicy(module, int(extra['in_features']))
+
+
+def parity_states(in_features, samples=10_000, seed=0):
+    """States to compare models on: every binary state for the 11 features, random binary ones otherwise."""
+    if in_features == STATE_SIZE:
+        return np.array(list(itertools.product((0.0, 1.0), repeat=STATE_SIZE)), dtype=np.float32)
+    rng = np.random.default_rng(seed)
+    states = rng.integers(0, 2, (samples, in_features)).astype(np.float32)
+    states[:, STATE_SIZE:] = rng.random((samples, in_features - STATE_SIZE))  # reachable space is fractional
+    return states
+
+
+def parity(state_dict, policy, states=None):
+    """Agreement of ``policy``'s greedy actions with the float model's, and the largest Q-value difference."""
+    model = Linear_QNet.from_state_dict(state_dict).eval()
+    if states is None:
+        states = parity_states(model.linear1.in_features)
+    with torch.inference_mode():
+        expected = model(torch.from_numpy(states)).numpy()
+    q = policy.q_values(states)
+    return {'states': len(states),
+            'agreement': float((q.argmax(axis=1) == expected.argmax(axis=1)).mean()),
+            'max_abs_diff': float(np.abs(q - expected).max())}
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Export a trained model for fast inference and check it.')
+    parser.add_argument('checkpoint', nargs='?', default=os.path.join(MODEL_DIR, 'model.pth'),
+                        help='model or checkpoint file (default: models/model.pth)')
+    parser.add_argument('--kind', choices=sorted(KINDS), action='append',
+                        help='artifact to write, may be repeated (default: numpy)')
+    parser.add_argument('--output', default=None,
+                        help='output path without suffix (default: next to the checkpoint)')
+    parser.add_argument('--min-agreement', type=float, default=0.99,
+                        help='fail if fewer greedy actions than this agree with the float model')
+    args = parser.parse_args()
+
+    weights = load_weights(args.checkpoint)
+    base = args.output or os.path.splitext(args.checkpoint)[0]
+    ok = True
+    for kind in args.kind or ['numpy']:
+        out = base + KINDS[kind]
+        result = parity(weights, export(weights, out, kind))
+        print(f'{kind:12} {out}  agreement {result["agreement"]:.4f} over {result["states"]} states, '
+              f'max |dQ| {result["max_abs_diff"]:.2e}')
+        ok &= result['agreement'] >= args.min_agreement
+    sys.exit(0 if ok else 1)
@@ -0,0 +1,152 @@
+from collections import OrderedDict
+
+import numpy as np
+
+from bitboard import board_masks
+from bitboard import flood_fill
+from bitboard import grow
+from bitboard import mask_from_grid
+from game import BLOCK_SIZE
+from game import CLOCK_WISE
+from vec_env import DIR_DELTAS
+
+STATE_SIZE = 11
+REACH_SIZE = 6  # reachable_features: free space straight/right/left, tail reachable straight/right/left
+
+# direction index -> directions of the cells straight ahead, to the right and to the left
+LOOK_DIRS = np.array([[d, (d + 1) % 4, (d - 1) % 4] for d in range(4)], dtype=np.int64)
+LOOK_DELTAS = DIR_DELTAS[LOOK_DIRS]  # (4, 3, 2) cell offsets
+
+# direction index -> move direction features [left, right, up, down]
+DIR_FEATURES = np.array([[0, 1, 0, 0],   # right
+                         [0, 0, 0, 1],   # down
+                         [1, 0, 0, 0],   # left
+                         [0, 0, 1, 0]],  # up
+                        dtype=np.float32)
+
+DIRECTION_INDEX = {d: i for i, d in enumerate(CLOCK_WISE)}
+# the same tables for the single game path, as plain tuples
+_LOOK_DELTAS = tuple(tuple((int(dx), int(dy)) for dx, dy in deltas) for deltas in LOOK_DELTAS)
+_DIR_FEATURES = tuple(tuple(row) for row in DIR_FEATURES.tolist())
+
+
+def extract_features(occupancy, heads, directions, food, out=None):
+    """The 11 state features for a batch of games, written into ``out``.
+
+    ``occupancy`` is (N, rows, cols) with non-zero on body cells, ``heads`` and
+    ``food`` are (N, 2) cell coordinates (x, y) and ``directions`` are indices into
+    game.CLOCK_WISE. ``out`` is an (N, 11) float32 array, allocated if None.
+    Feature order matches Agent.get_state: danger straight/right/left, move
+    direction left/right/up/down, food left/right/up/down.
+    """
+    n, rows, cols = occupancy.shape
+    if out is None:
+        out = np.empty((n, STATE_SIZE), dtype=np.float32)
+
+    # danger: the three cells the snake can move into are off the board or on the body
+    cells = heads[:, None, :] + LOOK_DELTAS[directions]  # (N, 3, 2)
+    x = cells[..., 0]
+    y = cells[..., 1]
+    off_board = (x < 0) | (x >= cols) | (y < 0) | (y >= rows)
+    on_body = occupancy[np.arange(n)[:, None], np.clip(y, 0, rows - 1), np.clip(x, 0, cols - 1)] != 0
+    np.logical_or(off_board, on_body, out=out[:, 0:3], casting='unsafe')
+
+    out[:, 3:7] = DIR_FEATURES[directions]
+
+    np.less(food[:, 0], heads[:, 0], out=out[:, 7], casting='unsafe')
+    np.greater(food[:, 0], heads[:, 0], out=out[:, 8], casting='unsafe')
+    np.less(food[:, 1], heads[:, 1], out=out[:, 9], casting='unsafe')
+    np.greater(food[:, 1], heads[:, 1], out=out[:, 10], casting='unsafe')
+    return out
+
+
+def game_features(game, out=None):
+    """The 11 state features of one SnakeGameAI, written into the length 11 array ``out``.
+
+    Uses the same lookup tables as extract_features, reading game.grid directly
+    with scalar code, which is cheaper than numpy calls for a single game.
+    """
+    if out is None:
+        out = np.empty(STATE_SIZE, dtype=np.float32)
+    d = DIRECTION_INDEX[game.direction]
+    head = game.head
+    food = game.food
+    hx = int(head.x // BLOCK_SIZE)
+    hy = int(head.y // BLOCK_SIZE)
+    cols, rows, grid = game.cols, game.rows, game.grid
+    danger = [x < 0 or x >= cols or y < 0 or y >= rows or grid[y * cols + x] != 0
+              for x, y in ((hx + dx, hy + dy) for dx, dy in _LOOK_DELTAS[d])]
+    out[:] = (*danger, *_DIR_FEATURES[d],
+              food.x < head.x, food.x > head.x, food.y < head.y, food.y > head.y)
+    return out
+
+
+class ReachabilityCache:
+    """LRU cache of reachable_features results keyed by head, direction, tail and body bitboard."""
+
+    def __init__(self, maxsize=4096):
+        self.maxsize = maxsize
+        self.entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key):
+        values = self.entries.get(key)
+        if values is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+            self.entries.move_to_end(key)
+        return values
+
+    def put(self, key, values):
+        self.entries[key] = values
+        if len(self.entries) > self.maxsize:
+            self.entries.popitem(last=False)
+
+
+def reachable_features(game, out=None, cache=None):
+    """Look-ahead features for the three moves of one SnakeGameAI, written into ``out``.
+
+    For straight/right/left: the share of the board's free cells reachable from
+    the cell the move enters (0 if that cell is fatal), then whether the tail is
+    next to that region, i.e. whether the snake can still follow its tail out.
+    Regions are flood filled on bitboards and shared between moves that land in
+    the same region; results are kept in ``cache`` if one is given.
+    """
+    if out is None:
+        out = np.empty(REACH_SIZE, dtype=np.float32)
+    d = DIRECTION_INDEX[game.direction]
+    hx = int(game.head.x // BLOCK_SIZE)
+    hy = int(game.head.y // BLOCK_SIZE)
+    cols, rows = game.cols, game.rows
+    tail = game._cell(game.snake[-1])
+    body = mask_from_grid(game.grid)
+
+    key = (hx, hy, d, tail, body)
+    values = cache.get(key) if cache is not None else None
+    if values is None:
+        free = board_masks(cols, rows)[0] & ~body
+        free_count = max(free.bit_count(), 1)
+        tail_bit = 1 << tail
+        space = []
+        tail_reachable = []
+        regions = []
+        for x, y in ((hx + dx, hy + dy) for dx, dy in _LOOK_DELTAS[d]):
+            bit = 1 << (y * cols + x) if 0 <= x < cols and 0 <= y < rows else 0
+            if not bit & free:
+                space.append(0.0)
+                tail_reachable.append(False)
+                continue
+            region = next((r for r in regions if r & bit), None)
+            if region is None:
+                region = flood_fill(bit, free, cols, rows)
+                regions.append(region)
+            space.append(region.bit_count() / free_count)
+            tail_reachable.append(bool(grow(region, cols, rows) & tail_bit))
+        values = (*space, *tail_reachable)
+        if cache is not None:
+            cache.put(key, values)
+
+    out[:] = values
+    return out
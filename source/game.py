@@ -1,19 +1,8 @@
 import random
+from collections import deque
 from collections import namedtuple
 from enum import Enum
 
-import numpy as np
-import pygame
-
-pygame.init()
-font_score = pygame.font.Font('../fonts/arial.ttf', 24)
-font_lrg = pygame.font.Font('../fonts/arial.ttf', 40)
-font_sml = pygame.font.Font('../fonts/arial.ttf', 14)
-font_tny = pygame.font.Font('../fonts/arial.ttf', 10)
-font_tnyblk = pygame.font.Font('../fonts/ariblk.ttf', 10)
-
-
-# font = pygame.font.SysFont('arial', 25)
 
 class Direction(Enum):
     RIGHT = 1
@@ -24,17 +13,8 @@ class Direction(Enum):
 
 Point = namedtuple('Point', 'x, y')
 
-# rgb colors
-WHITE = (255, 255, 255)
-GRAY1 = (172, 172, 172)
-GRAY2 = (128, 128, 128)
-GRAY3 = (64, 64, 64)
-BLACK = (0, 0, 0)
-RED1 = (200, 0, 0)
-RED2 = (255, 140, 0)
-GREEN = (124, 252, 0)
-BLUE1 = (0, 0, 255)
-BLUE2 = (0, 100, 255)
+# [straight, right, left] turns step through this list
+CLOCK_WISE = [Direction.RIGHT, Direction.DOWN, Direction.LEFT, Direction.UP]
 
 BLOCK_SIZE = 20
 
@@ -45,80 +25,130 @@ TOO_SLOW = -2
 LOOPING = -1
 ATE_FOOD = 10
 
+# reward table: game over by cause ('wall', 'self', 'timeout'), eating ('food') and any other move ('step').
+# Every death gets HIT_WALL by default; pass rewards={'self': HIT_SELF, ...} to SnakeGameAI to try others.
+# VecSnakeGame and BitboardSnake always use HIT_WALL / ATE_FOOD.
+REWARDS = {'wall': HIT_WALL, 'self': HIT_WALL, 'timeout': HIT_WALL, 'food': ATE_FOOD, 'step': 0}
+
 
 class SnakeGameAI:
     direction: Direction
     head: Point
     food: Point
-    snake: []
+    snake: deque
+    grid: bytearray
     score: int
     frame_iterations: int
-    plot_data: []
-    plot_data_raw: []
-    paused: bool
-    show_plot: bool
-    show_matplot: bool
-    game_speed: int
-
-    def __init__(self, w=1280, h=760):
+    death: str
+    observers: []
+
+    def __init__(self, w=1280, h=760, headless=False, seed=None, rewards=None):
         self.w = w
         self.h = h
-        self.game_speed = 100
-        # init display
-        self.display = pygame.display.set_mode((self.w, self.h))
-        pygame.display.set_caption('Snake')
-        self.clock = pygame.time.Clock()
-        self.plot_surf = pygame.Surface((self.w, self.h))
-        self.plot_surf.set_alpha(100)
+        unknown = set(rewards or ()) - set(REWARDS)
+        if unknown:
+            raise ValueError(f'unknown rewards {sorted(unknown)}, expected some of {sorted(REWARDS)}')
+        self.rewards = {**REWARDS, **(rewards or {})}
+        self.cols = w // BLOCK_SIZE
+        self.rows = h // BLOCK_SIZE
+        self.observers = []
+        self.renderer = None
+        # food placement draws from the global random module unless the game is seeded
+        self.rng = random if seed is None else random.Random(seed)
         self.reset()
-        self.show_plot = True
-        self.show_matplot = False
-
-    def reset(self):
+        if not headless:
+            # imported here so headless games never touch pygame
+            from renderer import GameRenderer
+            self.renderer = GameRenderer(self)
+            self.attach(self.renderer)
+
+    @property
+    def headless(self) -> bool:
+        return self.renderer is None
+
+    def attach(self, observer):
+        # observers get on_reset(game) / on_step(game) calls
+        if observer not in self.observers:
+            self.observers.append(observer)
+
+    def detach(self, observer):
+        if observer in self.observers:
+            self.observers.remove(observer)
+
+    def reset(self, seed=None):
+        # a seed makes the new game's food placement reproducible
+        if seed is not None:
+            self.rng = random.Random(seed)
         # init game state
-        self.direction = Direction.RIGHT
-
-        self.head = Point(self.w / 2, self.h / 2)
-        self.snake = [self.head,
-                      Point(self.head.x - BLOCK_SIZE, self.head.y),
-                      Point(self.head.x - (2 * BLOCK_SIZE), self.head.y)]
+        head = Point(self.w / 2, self.h / 2)
+        self.set_snake([head,
+                        Point(head.x - BLOCK_SIZE, head.y),
+                        Point(head.x - (2 * BLOCK_SIZE), head.y)], Direction.RIGHT)
+
+        for observer in self.observers:
+            observer.on_reset(self)
+
+    def set_snake(self, snake, direction):
+        # start a game from the given body (head first), e.g. a long snake for benchmarks
+        self.direction = direction
+        self.snake = deque(snake)
+        self.head = self.snake[0]
+
+        # number of snake segments on each cell, row major
+        self.grid = bytearray(self.cols * self.rows)
+        # cells with no segment on them; _free_pos maps a cell to its slot in _free
+        self._free = list(range(self.cols * self.rows))
+        self._free_pos = list(range(self.cols * self.rows))
+        for pt in self.snake:
+            self._occupy(self._cell(pt))
 
         self.score = 0
         self.frame_iterations = 0
-        self.paused = False
-        self.plot_data = []
-        self.plot_data_raw = []
+        # what ended the game: 'wall', 'self', 'timeout' or 'won'; None while it runs
+        self.death = None
         self._place_food()
 
-    def _place_food(self):
-        x = random.randint(0, (self.w - BLOCK_SIZE) // BLOCK_SIZE) * BLOCK_SIZE
-        y = random.randint(0, (self.h - BLOCK_SIZE) // BLOCK_SIZE) * BLOCK_SIZE
-        self.food = Point(x, y)
-        if self.food in self.snake:
-            self._place_food()
+    def _place_food(self) -> bool:
+        # uniform draw from the free cells; False when the snake fills the board
+        if not self._free:
+            return False
+        cell = self._free[self.rng.randrange(len(self._free))]
+        self.food = Point((cell % self.cols) * BLOCK_SIZE, (cell // self.cols) * BLOCK_SIZE)
+        return True
+
+    def _occupy(self, cell):
+        self.grid[cell] += 1
+        if self.grid[cell] == 1:
+            # swap-remove the cell from the free list
+            idx = self._free_pos[cell]
+            last = self._free.pop()
+            if last != cell:
+                self._free[idx] = last
+                self._free_pos[last] = idx
+            self._free_pos[cell] = -1
+
+    def _vacate(self, cell):
+        self.grid[cell] -= 1
+        if self.grid[cell] == 0:
+            self._free_pos[cell] = len(self._free)
+            self._free.append(cell)
+
+    @property
+    def board_full(self) -> bool:
+        return not self._free
 
     def read_input(self):
-        # 0. collect user input
-        for event in pygame.event.get():
-            if event.type == pygame.QUIT:
-                pygame.quit()
-                quit()
-            if event.type == pygame.KEYDOWN:
-                if event.key == pygame.K_PAUSE:
-                    self.paused = not self.paused
-                if event.key == pygame.K_F1:
-                    self.show_plot = not self.show_plot
-                if event.key == pygame.K_F2:
-                    self.show_matplot = not self.show_matplot
-                if event.key == pygame.K_PAGEUP:
-                    self.game_speed = min(self.game_speed + 20, 400)
-                    print(f'GAME SPEED: {self.game_speed}')
-                if event.key == pygame.K_PAGEDOWN:
-                    self.game_speed = max(self.game_speed - 20, 20)
-                    print(f'GAME SPEED: {self.game_speed}')
-        if self.paused:
-            self._update_ui()
-        return self.paused, self.show_plot, self.show_matplot
+        if self.renderer is None:
+            return False, False, False
+        return self.renderer.read_input()
+
+    def update_plot_data(self, scores: []):
+        if self.renderer is not None:
+            self.renderer.update_plot_data(scores)
+
+    def add_plot_score(self, score):
+        if self.renderer is not None:
+            self.renderer.add_score(score)
 
     def play_step(self, action):
         # 1. Start counting frame iterations
@@ -126,27 +156,39 @@ class SnakeGameAI:
 
         # 2. move
         self._move(action)  # update the head
-        self.snake.insert(0, self.head)
+        self.snake.appendleft(self.head)
 
         # 3. check if game over
-        reward = 0
+        reward = self.rewards['step']
         game_over = False
+        if not self._out_of_bounds(self.head):
+            self._occupy(self._cell(self.head))
         if self.is_collision() or self.frame_iterations > 100 * len(self.snake):
+            if self._out_of_bounds(self.head):
+                self.death = 'wall'
+            elif self.is_collision():
+                self.death = 'self'
+            else:
+                self.death = 'timeout'
             game_over = True
-            reward = HIT_WALL
+            reward = self.rewards[self.death]
             return reward, game_over, self.score
 
         # 4. place new food or just move
         if self.head == self.food:
             self.score += 1
-            reward = ATE_FOOD
-            self._place_food()
+            reward = self.rewards['food']
+            if not self._place_food():
+                # no room left for food: the board is won
+                self.death = 'won'
+                game_over = True
+                return reward, game_over, self.score
         else:
-            self.snake.pop()
+            self._vacate(self._cell(self.snake.pop()))
 
-        # 5. update ui and clock
-        self._update_ui()
-        self.clock.tick(self.game_speed)
+        # 5. notify observers (ui and clock live in the renderer)
+        for observer in self.observers:
+            observer.on_step(self)
         # 6. return game over and score
         return reward, game_over, self.score
 
@@ -154,107 +196,33 @@ class SnakeGameAI:
         if pt is None:
             pt = self.head
         # hits boundary
-        if pt.x > self.w - BLOCK_SIZE or pt.x < 0 or pt.y > self.h - BLOCK_SIZE or pt.y < 0:
-            return True
-        # hits itself
-        if pt in self.snake[1:]:
+        if self._out_of_bounds(pt):
             return True
+        # hits itself: any segment on the cell other than the head
+        count = self.grid[self._cell(pt)]
+        if pt == self.snake[0]:
+            count -= 1
+        return count > 0
 
-        return False
-
-    def update_plot_data(self, scores: []):
-        self.plot_data_raw = scores
-        self.plot_data = scores[-int(self.w / 2):]
-
-    def calc_high_score(self) -> (int, int):
-        hs = 0
-        idx = 0
-        i = 0
-        for score in self.plot_data:
-            if score >= hs:
-                hs = score
-                idx = i
-            i += 1
-        return idx, hs
-
-    def _update_ui(self):
-        # Clear screen
-        self.display.fill(BLACK)
-
-        # Show Plot
-        if self.show_plot:
-            self.plot_surf.fill(BLACK)
-            hsi, hs = self.calc_high_score()
-            high_score = font_tnyblk.render(f'{hs}', True, WHITE)
-            iterations = font_tny.render(f'{hsi}/{len(self.plot_data_raw)}', True, WHITE)
-            x = 0
-            for score in self.plot_data:
-                y = self.h - ((score * 2) + 2)
-                if score > 0:
-                    pygame.draw.line(self.plot_surf, GRAY1, (x, y), (x, self.h))
-                    pygame.draw.line(self.plot_surf, GRAY1, (x + 1, y), (x + 1, self.h))
-                else:
-                    pygame.draw.line(self.plot_surf, GRAY3, (x, self.h - 4), (x, self.h))
-                    pygame.draw.line(self.plot_surf, GRAY3, (x + 1, self.h - 4), (x + 1, self.h))
-                x += 2
-
-            if hs > 0:
-                self._place_text(self.plot_surf, Point(hsi * 2, (self.h - ((hs * 2) + 2)) - 16), high_score)
-                self._place_text(self.plot_surf, Point(hsi * 2, (self.h - ((hs * 2) + 2)) - 8), iterations)
-
-            self.display.blit(self.plot_surf, [0, 0])
-
-        # Draw snake
-        for pt in self.snake:
-            if self.snake.index(pt) == 0:
-                pygame.draw.rect(self.display, BLUE1, pygame.Rect(pt.x, pt.y, BLOCK_SIZE, BLOCK_SIZE))
-                pygame.draw.rect(self.display, WHITE, pygame.Rect(pt.x + 4, pt.y + 4, BLOCK_SIZE - 8, BLOCK_SIZE - 8))
-                pygame.draw.rect(self.display, BLACK, pygame.Rect(pt.x + 8, pt.y + 8, BLOCK_SIZE - 16, BLOCK_SIZE - 16))
-            else:
-                pygame.draw.rect(self.display, BLUE1, pygame.Rect(pt.x, pt.y, BLOCK_SIZE, BLOCK_SIZE))
-                pygame.draw.rect(self.display, BLUE2, pygame.Rect(pt.x + 4, pt.y + 4, BLOCK_SIZE - 8, BLOCK_SIZE - 8))
-
-        # Draw food
-        pygame.draw.rect(self.display, RED1, pygame.Rect(self.food.x, self.food.y, BLOCK_SIZE, BLOCK_SIZE))
-        pygame.draw.rect(self.display, RED2, pygame.Rect(self.food.x + 4, self.food.y + 4, BLOCK_SIZE - 9, BLOCK_SIZE - 9))
-
-        # Draw score
-        score = font_score.render("Score: " + str(self.score), True, WHITE)
-        self.display.blit(score, [2, 0])
-
-        # Draw paused text
-        if self.paused:
-            above = Point(self.w / 2, (self.h / 2) - 15)
-            paused = font_lrg.render("PAUSED", True, WHITE)
-            self._place_text(self.display, above, paused)
-
-            below = Point(self.w / 2, (self.h / 2) + 15)
-            press_to_continue = font_sml.render("Press PAUSE to continue...", True, WHITE)
-            self._place_text(self.display, below, press_to_continue)
-
-        pygame.display.flip()
+    def _out_of_bounds(self, pt):
+        return pt.x > self.w - BLOCK_SIZE or pt.x < 0 or pt.y > self.h - BLOCK_SIZE or pt.y < 0
 
-    @staticmethod
-    def _place_text(surf: pygame.Surface, position: Point, text):
-        text_size = text.get_size()
-        x = position.x - text_size[0] / 2
-        y = position.y - text_size[1] / 2
-        surf.blit(text, [x, y])
+    def _cell(self, pt):
+        return int(pt.y // BLOCK_SIZE) * self.cols + int(pt.x // BLOCK_SIZE)
 
     def _move(self, action):
         # [straight, right, left]
 
-        clock_wise = [Direction.RIGHT, Direction.DOWN, Direction.LEFT, Direction.UP]
-        idx = clock_wise.index(self.direction)
+        idx = CLOCK_WISE.index(self.direction)
 
-        if np.array_equal(action, [1, 0, 0]):
-            new_dir = clock_wise[idx]  # no change
-        elif np.array_equal(action, [0, 1, 0]):
+        if action[0]:
+            new_dir = CLOCK_WISE[idx]  # no change
+        elif action[1]:
             next_idx = (idx + 1) % 4
-            new_dir = clock_wise[next_idx]  # right turn r -> d -> l -> u
+            new_dir = CLOCK_WISE[next_idx]  # right turn r -> d -> l -> u
         else:  # [0, 0, 1]
             next_idx = (idx - 1) % 4
-            new_dir = clock_wise[next_idx]  # left turn r -> u -> l -> d
+            new_dir = CLOCK_WISE[next_idx]  # left turn r -> u -> l -> d
 
         self.direction = new_dir
 
@@ -1,24 +1,112 @@
-import matplotlib.pyplot as plt
-from IPython import display
-
-plt.ion()
-
-
-def plot(scores, mean_scores):
-    display.clear_output(wait=True)
-    display.display(plt.gcf())
-    plt.clf()
-    plt.title('Training...')
-    plt.xlabel('Number of Games')
-    plt.ylabel('Score')
-    plt.plot(scores)
-    plt.plot(mean_scores)
-    plt.ylim(ymin=0)
-    plt.text(len(scores) - 1, scores[-1], str(scores[-1]))
-    plt.text(len(mean_scores) - 1, mean_scores[-1], str(mean_scores[-1]))
+import argparse
+import json
+import multiprocessing as mp
+import os
+
+
+class Series:
+    """Points of a growing series, thinned to at most ``max_points`` by keeping every stride-th one."""
+
+    def __init__(self, max_points=2000):
+        self.max_points = max_points
+        self.stride = 1
+        self.x = []
+        self.y = []
+        self._seen = 0
+
+    def append(self, x, y):
+        if self._seen % self.stride == 0:
+            self.x.append(x)
+            self.y.append(y)
+            if len(self.x) > self.max_points:
+                # halve the resolution: keep every other point
+                del self.x[1::2]
+                del self.y[1::2]
+                self.stride *= 2
+        self._seen += 1
+
+
+def read_rows(f):
+    """Complete JSON lines appended to ``f`` since the last call."""
+    rows = []
+    while True:
+        pos = f.tell()
+        line = f.readline()
+        if not line.endswith('\n'):
+            f.seek(pos)  # half written: read it again next time
+            return rows
+        rows.append(json.loads(line))
+
+
+def run_plotter(path, interval=1.0, max_points=2000):
+    """Tail a metrics log and plot score, mean and rolling mean, redrawing at most every ``interval`` seconds."""
+    # matplotlib is only imported in the plotting process
+    import matplotlib.pyplot as plt
+
+    scores = Series(max_points)
+    means = Series(max_points)
+    rolling = Series(max_points)
+    fig, ax = plt.subplots()
+    ax.set_title('Training...')
+    ax.set_xlabel('Number of Games')
+    ax.set_ylabel('Score')
+    score_line, = ax.plot([], [], label='score')
+    mean_line, = ax.plot([], [], label='mean')
+    rolling_line, = ax.plot([], [], label='rolling mean')
+    ax.legend(loc='upper left')
+    last_text = ax.text(0, 0, '')
+    mean_text = ax.text(0, 0, '')
     plt.show(block=False)
-    plt.pause(.1)
+
+    f = None
+    last = None
+    while plt.fignum_exists(fig.number):
+        if f is None:
+            try:
+                f = open(path)
+            except FileNotFoundError:
+                pass
+        if f is not None and os.fstat(f.fileno()).st_size < f.tell():
+            # the log was truncated by a new run
+            f.seek(0)
+            scores, means, rolling = Series(max_points), Series(max_points), Series(max_points)
+        rows = read_rows(f) if f is not None else []
+        for row in rows:
+            scores.append(row['game'], row['score'])
+            means.append(row['game'], row['mean'])
+            rolling.append(row['game'], row['rolling_mean'])
+            last = row
+        if rows:
+            score_line.set_data(scores.x, scores.y)
+            mean_line.set_data(means.x, means.y)
+            rolling_line.set_data(rolling.x, rolling.y)
+            last_text.set_position((last['game'], last['score']))
+            last_text.set_text(str(last['score']))
+            mean_text.set_position((last['game'], last['mean']))
+            mean_text.set_text(f'{last["mean"]:.2f}')
+            ax.relim()
+            ax.autoscale_view()
+            ax.set_ylim(bottom=0)
+            fig.canvas.draw_idle()
+        plt.pause(interval)
+
+
+def start_plotter(path, interval=1.0):
+    """Plot the metrics log at ``path`` in its own process, so drawing never stalls training."""
+    process = mp.get_context('spawn').Process(target=run_plotter, args=(path, interval), daemon=True)
+    process.start()
+    return process
+
+
+def stop_plotter(process):
+    if process is not None and process.is_alive():
+        process.terminate()
+        process.join()
 
 
-def close_figure():
-    plt.close('all')
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Plot a training metrics log as it grows.')
+    parser.add_argument('path', help='metrics JSONL file, e.g. ../models/metrics.jsonl')
+    parser.add_argument('--interval', type=float, default=1.0, help='seconds between redraws')
+    args = parser.parse_args()
+    run_plotter(args.path, interval=args.interval)
@@ -0,0 +1,72 @@
+import json
+import time
+from collections import deque
+
+
+class Metrics:
+    """Per-game score statistics kept in O(1) time and bounded memory.
+
+    ``window`` is the length of the rolling mean; ``history`` how many recent
+    scores are kept for the in-game plot and checkpoints.
+    """
+
+    def __init__(self, window=100, history=1000):
+        self.window = window
+        self.n_games = 0
+        self.total_score = 0
+        self.record = 0
+        self.recent = deque(maxlen=history)
+        self._window_scores = deque()
+        self._window_sum = 0
+
+    @property
+    def mean_score(self):
+        return self.total_score / self.n_games if self.n_games else 0.0
+
+    @property
+    def rolling_mean(self):
+        return self._window_sum / len(self._window_scores) if self._window_scores else 0.0
+
+    def add(self, score, **extra):
+        """Count a finished game; returns its row for the metrics log."""
+        self.n_games += 1
+        self.total_score += score
+        self.record = max(self.record, score)
+        self.recent.append(score)
+        self._window_scores.append(score)
+        self._window_sum += score
+        if len(self._window_scores) > self.window:
+            self._window_sum -= self._window_scores.popleft()
+        return {'game': self.n_games, 'score': score, 'mean': self.mean_score,
+                'rolling_mean': self.rolling_mean, 'record': self.record, 'time': time.time(), **extra}
+
+    def state(self):
+        return {'n_games': self.n_games, 'total_score': self.total_score, 'record': self.record,
+                'recent': list(self.recent)}
+
+    def load_state(self, state):
+        self.n_games = state['n_games']
+        self.total_score = state['total_score']
+        self.record = state['record']
+        self.recent.clear()
+        self._window_scores.clear()
+        self._window_sum = 0
+        for score in state['recent']:
+            self.recent.append(score)
+        for score in state['recent'][-self.window:]:
+            self._window_scores.append(score)
+            self._window_sum += score
+
+
+class MetricsLog:
+    """One JSON line per game, appended to ``path`` for helper.py's plotter to tail."""
+
+    def __init__(self, path, append=False):
+        self.path = path
+        self._file = open(path, 'a' if append else 'w', buffering=1)  # line buffered: readers see whole games
+
+    def write(self, row):
+        self._file.write(json.dumps(row) + '\n')
+
+    def close(self):
+        self._file.close()
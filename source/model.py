@@ -1,10 +1,14 @@
 import os
 
+import numpy as np
 import torch
 import torch.nn as nn
 import torch.nn.functional as nnf
 import torch.optim as optim
 
+# models/ at the repository root, wherever the scripts are run from
+MODEL_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'models')
+
 
 class Linear_QNet(nn.Module):
     def __init__(self, input_size, hidden_size, output_size):
@@ -18,7 +22,7 @@ class Linear_QNet(nn.Module):
         return x
 
     def save(self, file_name='model.pth'):
-        model_folder_path = '../models'
+        model_folder_path = MODEL_DIR
         if not os.path.exists(model_folder_path):
             os.makedirs(model_folder_path)
 
@@ -26,13 +30,27 @@ class Linear_QNet(nn.Module):
         torch.save(self.state_dict(), file_name)
 
     def load(self, file_name='model.pth'):
-        model_folder_path = '..\\models'
+        model_folder_path = MODEL_DIR
         file_path = os.path.join(model_folder_path, file_name)
         if os.path.exists(file_path):
             print(f"Loading: {file_path}")
-            self.load_state_dict(torch.load(file_path))
+            self.load_state_dict(load_weights(file_path))
             self.train(True)
 
+    @classmethod
+    def from_state_dict(cls, state_dict):
+        """A network shaped to fit ``state_dict``, with those weights loaded."""
+        hidden_size, input_size = state_dict['linear1.weight'].shape
+        model = cls(input_size, hidden_size, state_dict['linear2.weight'].shape[0])
+        model.load_state_dict(state_dict)
+        return model
+
+
+def load_weights(path):
+    """Model state dict from a Linear_QNet.save file or a training checkpoint."""
+    data = torch.load(path, map_location='cpu', weights_only=False)
+    return data.get('model_state_dic', data)
+
 
 class QTrainer:
     def __init__(self, model, lr, gamma):
@@ -42,11 +60,16 @@ class QTrainer:
         self.optimizer = optim.Adam(model.parameters(), lr=self.lr)
         self.criterion = nn.MSELoss()
 
-    def train_step(self, state, action, reward, next_state, done):
-        state = torch.tensor(state, dtype=torch.float)
-        next_state = torch.tensor(next_state, dtype=torch.float)
-        action = torch.tensor(action, dtype=torch.long)
-        reward = torch.tensor(reward, dtype=torch.float)
+    def train_step(self, state, action, reward, next_state, done, weights=None):
+        """One gradient step on a transition or a batch; returns the absolute TD errors.
+
+        ``weights`` are optional per-sample importance-sampling weights applied to the loss.
+        """
+        state = self._as_tensor(state, torch.float)
+        next_state = self._as_tensor(next_state, torch.float)
+        action = self._as_tensor(action, torch.long)
+        reward = self._as_tensor(reward, torch.float)
+        done = self._as_tensor(done, torch.bool)
         # (n, x)
 
         if len(state.shape) == 1:
@@ -55,24 +78,41 @@ class QTrainer:
             next_state = torch.unsqueeze(next_state, 0)
             action = torch.unsqueeze(action, 0)
             reward = torch.unsqueeze(reward, 0)
-            done = (done,)
+            done = torch.unsqueeze(done, 0)
+
+        if len(action.shape) == 2:
+            # one-hot [straight, right, left] -> action index
+            action = action.argmax(dim=1)
 
         # 1: predicted Q values with current state
         pred = self.model(state)
 
-        target = pred.clone()
-        for idx in range(len(done)):
-            q_new = reward[idx]
-            if not done[idx]:
-                q_new = reward[idx] + self.gamma * torch.max(self.model(next_state[idx]))
-
-            target[idx][torch.argmax(action[idx]).item()] = q_new
-
         # 2: Q_new = r + y * max(next_predicted Q value) -> only do this if not done
-        # pred.clone()
-        # pred[argmax(action)] = Q_new
+        with torch.no_grad():
+            next_q = self.model(next_state).max(dim=1).values
+            q_new = reward + self.gamma * next_q * (~done)
+            rows = torch.arange(len(pred))
+            target = pred.detach().clone()
+            target[rows, action] = q_new
+            td_errors = (q_new - pred[rows, action]).abs()
+
         self.optimizer.zero_grad()
-        loss = self.criterion(target, pred)
+        if weights is None:
+            loss = self.criterion(target, pred)
+        else:
+            # same scale as the MSE over all (n, 3) entries, each sample weighted
+            weights = self._as_tensor(weights, torch.float)
+            loss = (weights.unsqueeze(1) * (target - pred) ** 2).mean()
         loss.backward()
 
         self.optimizer.step()
+        return td_errors.numpy()
+
+    @staticmethod
+    def _as_tensor(data, dtype):
+        # stack sequences of arrays in numpy first; torch.tensor on a list of arrays is very slow
+        if isinstance(data, torch.Tensor):
+            return data.to(dtype)
+        if isinstance(data, (list, tuple)):
+            data = np.asarray(data)
+        return torch.as_tensor(data, dtype=dtype)
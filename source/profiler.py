@@ -0,0 +1,180 @@
+import json
+import math
+import time
+
+# latency histogram: BUCKETS_PER_OCTAVE log-spaced buckets per doubling, from 1 ns up
+BUCKETS_PER_OCTAVE = 8
+N_BUCKETS = 40 * BUCKETS_PER_OCTAVE  # up to 2**40 ns, about 18 minutes
+PERCENTILES = (50, 90, 99)
+
+
+class _Phase:
+    """Timer for one named phase; re-entered for every call, so timing allocates nothing."""
+    __slots__ = ('name', 'count', 'total', 'max', 'buckets', '_start')
+
+    def __init__(self, name):
+        self.name = name
+        self._start = 0
+        self.clear()
+
+    def clear(self):
+        self.count = 0
+        self.total = 0
+        self.max = 0
+        self.buckets = [0] * N_BUCKETS
+
+    def __enter__(self):
+        self._start = time.perf_counter_ns()
+
+    def __exit__(self, *exc):
+        ns = time.perf_counter_ns() - self._start
+        self.count += 1
+        self.total += ns
+        if ns > self.max:
+            self.max = ns
+        self.buckets[min(int(math.log2(ns + 1) * BUCKETS_PER_OCTAVE), N_BUCKETS - 1)] += 1
+
+    def percentile(self, q):
+        """Upper edge, in ns, of the histogram bucket holding the q-th percentile call."""
+        rank = math.ceil(self.count * q / 100)
+        seen = 0
+        for i, n in enumerate(self.buckets):
+            seen += n
+            if seen >= rank:
+                return min(2 ** ((i + 1) / BUCKETS_PER_OCTAVE), self.max)
+        return self.max
+
+    def summary(self, elapsed, scale=1):
+        # scale: calls per timed call, to estimate totals from sampled timings
+        total = self.total * scale
+        stats = {'count': self.count,
+                 'total_ms': total / 1e6,
+                 'share': total / 1e9 / elapsed if elapsed else 0.0,
+                 'max_us': self.max / 1e3}
+        for q in PERCENTILES:
+            stats[f'p{q}_us'] = self.percentile(q) / 1e3 if self.count else 0.0
+        return stats
+
+
+class _NullPhase:
+    __slots__ = ()
+
+    def __enter__(self):
+        pass
+
+    def __exit__(self, *exc):
+        pass
+
+
+_NULL_PHASE = _NullPhase()
+
+
+class NullProfiler:
+    """Profiler that does nothing: the default, so instrumented code pays only a method call."""
+    enabled = False
+
+    def phase(self, name):
+        return _NULL_PHASE
+
+    def count(self, name, n=1):
+        pass
+
+    def tick(self):
+        pass
+
+    def close(self):
+        pass
+
+
+NULL_PROFILER = NullProfiler()
+
+
+class Profiler:
+    """Per-phase wall time counters and latency histograms for the train loop.
+
+    ``with profiler.phase('play_step'):`` times a block, ``count('steps')``
+    bumps a rate counter and ``tick()``, called once per loop iteration, emits a
+    summary every ``interval`` seconds: printed, and appended as one JSON line
+    to ``path`` if given. Phases may nest (a phase's time includes its nested
+    ones). Histograms are fixed size, so memory does not grow with run length,
+    and every interval starts from zero.
+
+    With ``sample_every`` N > 1 only one loop iteration in N is timed, the
+    others pay a method call per phase; counts are of timed calls and totals
+    and shares are scaled up by N. Counters always count every call.
+    """
+    enabled = True
+
+    def __init__(self, path=None, interval=10.0, verbose=True, sample_every=1):
+        self.path = path
+        self.interval = interval
+        self.verbose = verbose
+        self.sample_every = sample_every
+        self._sampled = True
+        self._step = 0
+        self.phases = {}
+        self.counters = {}
+        self._file = open(path, 'a') if path else None
+        self._started = time.perf_counter()
+        self._last = self._started
+        self._next_check = 0
+
+    def phase(self, name):
+        if not self._sampled:
+            return _NULL_PHASE
+        timer = self.phases.get(name)
+        if timer is None:
+            timer = self.phases[name] = _Phase(name)
+        return timer
+
+    def count(self, name, n=1):
+        self.counters[name] = self.counters.get(name, 0) + n
+
+    def tick(self):
+        # starts a loop iteration: is it timed?
+        self._step += 1
+        self._sampled = self._step % self.sample_every == 0
+        # only look at the clock every 256 calls
+        self._next_check -= 1
+        if self._next_check > 0:
+            return
+        self._next_check = 256
+        if time.perf_counter() - self._last >= self.interval:
+            self.emit()
+
+    def emit(self):
+        """Write out the current interval and start a new one."""
+        now = time.perf_counter()
+        elapsed = now - self._last
+        record = {'time': time.time(),
+                  'elapsed': now - self._started,
+                  'interval': elapsed,
+                  'sample_every': self.sample_every,
+                  'counters': dict(self.counters),
+                  'rates': {f'{k}_per_sec': v / elapsed for k, v in self.counters.items()},
+                  'phases': {name: p.summary(elapsed, self.sample_every) for name, p in self.phases.items() if p.count}}
+        if self._file is not None:
+            self._file.write(json.dumps(record) + '\n')
+            self._file.flush()
+        if self.verbose:
+            print(self.format(record))
+        for p in self.phases.values():
+            p.clear()
+        self.counters = {k: 0 for k in self.counters}
+        self._last = now
+        return record
+
+    @staticmethod
+    def format(record):
+        lines = ['profile: ' + '  '.join(f'{k} {v:.1f}' for k, v in record['rates'].items())]
+        for name, s in sorted(record['phases'].items(), key=lambda item: -item[1]['total_ms']):
+            lines.append(f'  {name:12} {s["share"]:6.1%} {s["count"]:8d} calls'
+                         f'  p50 {s["p50_us"]:9.1f} us  p99 {s["p99_us"]:9.1f} us  max {s["max_us"]:9.1f} us')
+        return '\n'.join(lines)
+
+    def close(self):
+        if any(self.counters.values()) or any(p.count for p in self.phases.values()):
+            self.emit()
+        if self._file is not None:
+            self._file.close()
+            self._file = None
@@ -0,0 +1,59 @@
+import numpy as np
+import torch
+
+from features import STATE_SIZE
+
+N_STATES = 1 << STATE_SIZE  # the 11 features are binary: 2048 possible states
+
+# feature i is bit i of a state's index
+BIT_VALUES = (1 << np.arange(STATE_SIZE)).astype(np.float32)
+ALL_STATES = ((np.arange(N_STATES)[:, None] >> np.arange(STATE_SIZE)) & 1).astype(np.float32)
+
+
+def state_index(states):
+    """Table indices of an (N, 11) batch of binary states."""
+    return (np.asarray(states, dtype=np.float32) @ BIT_VALUES).astype(np.intp)
+
+
+class QTable:
+    """Q-values and greedy actions of every possible 11-feature state.
+
+    refresh() fills the table with one batched forward pass of the model;
+    picking an action is then an array lookup. The table lives in shared
+    memory, so a table passed to spawned processes is read by all of them and
+    refreshed by its owner. Same policy interface as export.NumpyQNet.
+    """
+
+    in_features = STATE_SIZE
+
+    def __init__(self):
+        self._q = torch.zeros(N_STATES, 3).share_memory_()
+        self._actions = torch.zeros(N_STATES, dtype=torch.uint8).share_memory_()
+        self._views()
+
+    def _views(self):
+        self.q = self._q.numpy()
+        self.actions = self._actions.numpy()
+
+    def __getstate__(self):
+        # only the shared tensors travel; torch.multiprocessing passes their memory, not a copy
+        return {'_q': self._q, '_actions': self._actions}
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._views()
+
+    def refresh(self, model):
+        """Recompute every entry from ``model``; call after its weights change."""
+        with torch.inference_mode():
+            q = model(torch.from_numpy(ALL_STATES))
+        self._q.copy_(q)
+        self._actions.copy_(q.argmax(dim=1))
+
+    def q_values(self, states):
+        """(N, 3) Q-values for an (N, 11) batch of states."""
+        return self.q[state_index(states)]
+
+    def act(self, state):
+        """Greedy action index for one state."""
+        return int(self.actions[int(np.dot(state, BIT_VALUES))])
@@ -0,0 +1,136 @@
+import argparse
+import struct
+from collections import namedtuple
+
+import numpy as np
+
+from game import SnakeGameAI
+
+# File layout: MAGIC, then episodes back to back, each an EPISODE_HEADER
+# (seed, board width, board height, score, steps) followed by the actions
+# packed 4 to a byte, 2 bits each, first action in the low bits.
+# Actions are indices: 0 straight, 1 right, 2 left.
+MAGIC = b'SNKEP\x00\x01\x00'
+EPISODE_HEADER = struct.Struct('<QHHII')
+
+Episode = namedtuple('Episode', 'seed, w, h, score, actions')  # actions: uint8 array, one per step
+
+
+def pack_actions(actions):
+    actions = np.asarray(actions, dtype=np.uint8)
+    padded = np.zeros(-(-len(actions) // 4) * 4, dtype=np.uint8)
+    padded[:len(actions)] = actions
+    quads = padded.reshape(-1, 4)
+    return (quads[:, 0] | (quads[:, 1] << 2) | (quads[:, 2] << 4) | (quads[:, 3] << 6)).tobytes()
+
+
+def unpack_actions(data, steps):
+    packed = np.frombuffer(data, dtype=np.uint8)
+    quads = np.stack([packed & 3, (packed >> 2) & 3, (packed >> 4) & 3, packed >> 6], axis=1)
+    return quads.reshape(-1)[:steps]
+
+
+class EpisodeRecorder:
+    """Collects the actions of the game being played, one byte per step until the game ends."""
+
+    def __init__(self):
+        self.seed = None
+        self.w = 0
+        self.h = 0
+        self._actions = bytearray()
+
+    def start(self, seed, w, h):
+        self.seed = seed
+        self.w = w
+        self.h = h
+        self._actions.clear()
+
+    def step(self, action):
+        """Record an action index, or a one-hot action as passed to play_step."""
+        if np.ndim(action) == 0:  # int or numpy integer index
+            self._actions.append(int(action))
+        else:
+            self._actions.append(0 if action[0] else 1 if action[1] else 2)
+
+    def finish(self, score):
+        return Episode(self.seed, self.w, self.h, score, np.frombuffer(bytes(self._actions), dtype=np.uint8))
+
+
+class EpisodeWriter:
+    """Appends episodes to a recording file, writing the file header if the file is new."""
+
+    def __init__(self, path):
+        self.path = path
+        self._file = open(path, 'ab')
+        if self._file.tell() == 0:
+            self._file.write(MAGIC)
+
+    def write(self, episode):
+        self._file.write(EPISODE_HEADER.pack(episode.seed, episode.w, episode.h, episode.score,
+                                             len(episode.actions)))
+        self._file.write(pack_actions(episode.actions))
+
+    def flush(self):
+        self._file.flush()
+
+    def close(self):
+        self._file.close()
+
+
+def read_episodes(path):
+    """Yield every Episode stored in a recording file."""
+    with open(path, 'rb') as f:
+        if f.read(len(MAGIC)) != MAGIC:
+            raise ValueError(f'{path} is not an episode recording')
+        while True:
+            header = f.read(EPISODE_HEADER.size)
+            if len(header) < EPISODE_HEADER.size:
+                return  # end of file, or an episode cut off by a crash
+            seed, w, h, score, steps = EPISODE_HEADER.unpack(header)
+            data = f.read(-(-steps // 4))
+            if len(data) < -(-steps // 4):
+                return
+            yield Episode(seed, w, h, score, unpack_actions(data, steps))
+
+
+def replay(episode, render=False, speed=None):
+    """Play an episode again on a board with its seed; returns the finished game.
+
+    Headless by default, at full speed. With ``render`` the game is shown in the
+    pygame window, at ``speed`` frames per second if given.
+    """
+    game = SnakeGameAI(w=episode.w, h=episode.h, headless=not render, seed=episode.seed)
+    if render and speed:
+        game.renderer.game_speed = speed
+    onehot = ([1, 0, 0], [0, 1, 0], [0, 0, 1])
+    for action in episode.actions.tolist():
+        if render:
+            game.read_input()
+        _, done, _ = game.play_step(onehot[action])
+        if done:
+            break
+    return game
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='List, check or watch recorded episodes.')
+    parser.add_argument('path', help='episode recording, e.g. ../models/episodes.bin')
+    parser.add_argument('--min-score', type=int, default=0, help='only episodes scoring at least this')
+    parser.add_argument('--best', type=int, default=None, metavar='N', help='only the N best episodes')
+    parser.add_argument('--verify', action='store_true', help='re-simulate each episode and check its score')
+    parser.add_argument('--render', action='store_true', help='show the selected episodes in the game window')
+    parser.add_argument('--speed', type=int, default=None, help='frames per second when rendering')
+    args = parser.parse_args()
+
+    episodes = [(i, e) for i, e in enumerate(read_episodes(args.path)) if e.score >= args.min_score]
+    if args.best is not None:
+        episodes = sorted(episodes, key=lambda item: -item[1].score)[:args.best]
+    for i, episode in episodes:
+        line = f'#{i} seed {episode.seed} board {episode.w}x{episode.h} score {episode.score} ' \
+               f'steps {len(episode.actions)}'
+        if args.verify or args.render:
+            game = replay(episode, render=args.render, speed=args.speed)
+            line += f' replayed score {game.score} ({game.death})'
+            if game.score != episode.score:
+                line += ' MISMATCH'
+        print(line)
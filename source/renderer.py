@@ -0,0 +1,300 @@
+import os
+from collections import deque
+
+import pygame
+
+from game import BLOCK_SIZE
+from game import Point
+from profiler import NULL_PROFILER
+
+# rgb colors
+WHITE = (255, 255, 255)
+GRAY1 = (172, 172, 172)
+GRAY2 = (128, 128, 128)
+GRAY3 = (64, 64, 64)
+BLACK = (0, 0, 0)
+RED1 = (200, 0, 0)
+RED2 = (255, 140, 0)
+GREEN = (124, 252, 0)
+BLUE1 = (0, 0, 255)
+BLUE2 = (0, 100, 255)
+
+# fonts/ at the repository root, wherever the scripts are run from
+FONT_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'fonts')
+
+
+class GameRenderer:
+    """Pygame window for a SnakeGameAI, attached to the game as an observer.
+
+    Frames are drawn incrementally: a step only repaints the cells that changed
+    (new head, the old head, the vacated tail, food) and the score, and pushes
+    just those rects to the screen. Everything else comes from ``background``,
+    which holds the score plot and is only recomposed when the plot changes, the
+    plot is toggled or a new game starts.
+    """
+    plot_data: deque
+    paused: bool
+    show_plot: bool
+    show_matplot: bool
+    game_speed: int
+
+    def __init__(self, game):
+        self.game = game
+        self.w = game.w
+        self.h = game.h
+        self.game_speed = 100
+        # init display
+        pygame.init()
+        self.font_score = pygame.font.Font(os.path.join(FONT_DIR, 'arial.ttf'), 24)
+        self.font_lrg = pygame.font.Font(os.path.join(FONT_DIR, 'arial.ttf'), 40)
+        self.font_sml = pygame.font.Font(os.path.join(FONT_DIR, 'arial.ttf'), 14)
+        self.font_tny = pygame.font.Font(os.path.join(FONT_DIR, 'arial.ttf'), 10)
+        self.font_tnyblk = pygame.font.Font(os.path.join(FONT_DIR, 'ariblk.ttf'), 10)
+        self.display = pygame.display.set_mode((self.w, self.h))
+        pygame.display.set_caption('Snake')
+        self.clock = pygame.time.Clock()
+        self.background = pygame.Surface((self.w, self.h))
+        self.plot_surf = pygame.Surface((self.w, self.h))
+        self.plot_surf.set_alpha(100)
+        self.plot_surf.fill(BLACK)
+        self.paused = False
+        # the plot shows the last w / 2 scores, 2 px per game
+        self.plot_width = int(self.w / 2)
+        self.plot_data = deque(maxlen=self.plot_width)
+        self._plotted = 0  # scores added so far
+        # (score index, score) with falling scores: the window's high score is the first one
+        self._high_scores = deque()
+        self.show_plot = True
+        self.show_matplot = False
+        self.profiler = NULL_PROFILER
+
+        self._paused_text = (self.font_lrg.render("PAUSED", True, WHITE),
+                             self.font_sml.render("Press PAUSE to continue...", True, WHITE))
+        self._score_text = None
+        self._score_rect = pygame.Rect(0, 0, 0, 0)
+        self._drawn_score = None
+        self._drawn_head = None
+        self._drawn_tail = None
+        self._drawn_food = None
+        self._stale = True  # next frame must be drawn in full
+
+    def on_reset(self, game):
+        self.paused = False
+        self._stale = True
+
+    def on_step(self, game):
+        with self.profiler.phase('render'):
+            self._update_ui()
+        with self.profiler.phase('tick'):
+            self.clock.tick(self.game_speed)
+
+    def redraw(self):
+        """Draw the whole frame now, e.g. after the game state was replaced."""
+        self._stale = True
+        self._update_ui()
+
+    def read_input(self):
+        # 0. collect user input
+        for event in pygame.event.get():
+            if event.type == pygame.QUIT:
+                pygame.quit()
+                quit()
+            if event.type == pygame.KEYDOWN:
+                if event.key == pygame.K_PAUSE:
+                    self.paused = not self.paused
+                    self._stale = True
+                if event.key == pygame.K_F1:
+                    self.show_plot = not self.show_plot
+                    self._stale = True
+                if event.key == pygame.K_F2:
+                    self.show_matplot = not self.show_matplot
+                if event.key == pygame.K_PAGEUP:
+                    self.game_speed = min(self.game_speed + 20, 400)
+                    print(f'GAME SPEED: {self.game_speed}')
+                if event.key == pygame.K_PAGEDOWN:
+                    self.game_speed = max(self.game_speed - 20, 20)
+                    print(f'GAME SPEED: {self.game_speed}')
+            if event.type == pygame.VIDEOEXPOSE:
+                self._stale = True
+        if self.paused:
+            self._update_ui()
+        return self.paused, self.show_plot, self.show_matplot
+
+    def update_plot_data(self, scores: []):
+        """Draw the scores added since the last call onto the plot surface."""
+        if len(scores) < self._plotted:
+            self._clear_plot()  # a different run's scores
+        new = len(scores) - self._plotted
+        if new >= self.plot_width:
+            # everything on the plot now would scroll out
+            self._clear_plot()
+            self._plotted = len(scores) - self.plot_width
+        for score in scores[self._plotted:]:
+            self._add_score(score)
+        self._stale = True
+
+    def add_score(self, score):
+        """Add one finished game's score to the plot."""
+        self._add_score(score)
+        self._stale = True
+
+    def calc_high_score(self) -> (int, int):
+        """(index in plot_data, score) of the latest highest score on the plot."""
+        if not self._high_scores:
+            return 0, 0
+        i, hs = self._high_scores[0]
+        return i - (self._plotted - len(self.plot_data)), hs
+
+    def _clear_plot(self):
+        self.plot_surf.fill(BLACK)
+        self.plot_data.clear()
+        self._high_scores.clear()
+        self._plotted = 0
+
+    def _add_score(self, score):
+        if len(self.plot_data) == self.plot_width:
+            self.plot_surf.scroll(-2, 0)
+            self.plot_surf.fill(BLACK, (self.w - 2, 0, 2, self.h))
+        x = 2 * len(self.plot_data) if len(self.plot_data) < self.plot_width else self.w - 2
+        if score > 0:
+            y = self.h - ((score * 2) + 2)
+            self.plot_surf.fill(GRAY1, (x, y, 2, self.h - y))
+        else:
+            self.plot_surf.fill(GRAY3, (x, self.h - 4, 2, 4))
+        self.plot_data.append(score)
+
+        # sliding window maximum; ties go to the latest game
+        high_scores = self._high_scores
+        while high_scores and high_scores[-1][1] <= score:
+            high_scores.pop()
+        high_scores.append((self._plotted, score))
+        self._plotted += 1
+        if high_scores[0][0] < self._plotted - len(self.plot_data):
+            high_scores.popleft()
+
+    def _compose_background(self):
+        self.background.fill(BLACK)
+        if not self.show_plot:
+            return
+        self.background.blit(self.plot_surf, [0, 0])
+        hsi, hs = self.calc_high_score()
+        if hs > 0:
+            high_score = self.font_tnyblk.render(f'{hs}', True, WHITE)
+            iterations = self.font_tny.render(f'{hsi}/{self._plotted}', True, WHITE)
+            # labels are dimmed like the bars
+            high_score.set_alpha(self.plot_surf.get_alpha())
+            iterations.set_alpha(self.plot_surf.get_alpha())
+            y = self.h - ((hs * 2) + 2)
+            self._place_text(self.background, Point(hsi * 2, y - 16), high_score)
+            self._place_text(self.background, Point(hsi * 2, y - 8), iterations)
+
+    def _update_ui(self):
+        if self._stale:
+            self._redraw()
+            return
+
+        game = self.game
+        dirty = []
+        # vacated tail: back to the background
+        tail = self._drawn_tail
+        if tail != game.snake[-1] and not game.grid[game._cell(tail)]:
+            dirty.append(self._draw_background(tail))
+        # the old head becomes body, the new head is drawn on top
+        if self._drawn_head != game.head:
+            if len(game.snake) > 1:
+                dirty.append(self._draw_body(game.snake[1]))
+            dirty.append(self._draw_head(game.head))
+        if self._drawn_food != game.food:
+            dirty.append(self._draw_food(game.food))
+        self._drawn_head = game.head
+        self._drawn_tail = game.snake[-1]
+        self._drawn_food = game.food
+
+        # the score is drawn over the board
+        if game.score != self._drawn_score or self._score_rect.collidelist(dirty) >= 0:
+            dirty.append(self._draw_score())
+        pygame.display.update(dirty)
+
+    def _redraw(self):
+        game = self.game
+        self._compose_background()
+        self.display.blit(self.background, [0, 0])
+
+        # Draw snake
+        for i, pt in enumerate(game.snake):
+            if i == 0:
+                self._draw_head(pt)
+            else:
+                self._draw_body(pt)
+        # Draw food
+        self._draw_food(game.food)
+        self._drawn_head = game.head
+        self._drawn_tail = game.snake[-1]
+        self._drawn_food = game.food
+
+        self._draw_score()
+
+        # Draw paused text
+        if self.paused:
+            paused, press_to_continue = self._paused_text
+            self._place_text(self.display, Point(self.w / 2, (self.h / 2) - 15), paused)
+            self._place_text(self.display, Point(self.w / 2, (self.h / 2) + 15), press_to_continue)
+
+        pygame.display.flip()
+        self._stale = False
+
+    def _draw_background(self, pt):
+        rect = pygame.Rect(pt.x, pt.y, BLOCK_SIZE, BLOCK_SIZE)
+        self.display.blit(self.background, rect, rect)
+        return rect
+
+    def _draw_head(self, pt):
+        rect = pygame.Rect(pt.x, pt.y, BLOCK_SIZE, BLOCK_SIZE)
+        self.display.fill(BLUE1, rect)
+        self.display.fill(WHITE, (pt.x + 4, pt.y + 4, BLOCK_SIZE - 8, BLOCK_SIZE - 8))
+        self.display.fill(BLACK, (pt.x + 8, pt.y + 8, BLOCK_SIZE - 16, BLOCK_SIZE - 16))
+        return rect
+
+    def _draw_body(self, pt):
+        rect = pygame.Rect(pt.x, pt.y, BLOCK_SIZE, BLOCK_SIZE)
+        self.display.fill(BLUE1, rect)
+        self.display.fill(BLUE2, (pt.x + 4, pt.y + 4, BLOCK_SIZE - 8, BLOCK_SIZE - 8))
+        return rect
+
+    def _draw_food(self, pt):
+        rect = pygame.Rect(pt.x, pt.y, BLOCK_SIZE, BLOCK_SIZE)
+        self.display.fill(RED1, rect)
+        self.display.fill(RED2, (pt.x + 4, pt.y + 4, BLOCK_SIZE - 9, BLOCK_SIZE - 9))
+        return rect
+
+    def _draw_score(self):
+        """Repaint the cells under the score text, then the text on top."""
+        game = self.game
+        if game.score != self._drawn_score:
+            self._score_text = self.font_score.render("Score: " + str(game.score), True, WHITE)
+            self._drawn_score = game.score
+        text_rect = self._score_text.get_rect(topleft=(2, 0)).union(self._score_rect)
+        self._score_rect = self._score_text.get_rect(topleft=(2, 0))
+        # whole cells, so the board under the text can be redrawn cell by cell
+        area = pygame.Rect(0, 0, -(-text_rect.right // BLOCK_SIZE) * BLOCK_SIZE,
+                           -(-text_rect.bottom // BLOCK_SIZE) * BLOCK_SIZE)
+        self.display.blit(self.background, area, area)
+        for y in range(0, min(area.bottom, game.h), BLOCK_SIZE):
+            for x in range(0, min(area.right, game.w), BLOCK_SIZE):
+                pt = Point(x, y)
+                if pt == game.food:
+                    self._draw_food(pt)
+                elif game.grid[game._cell(pt)]:
+                    if pt == game.head:
+                        self._draw_head(pt)
+                    else:
+                        self._draw_body(pt)
+        self.display.blit(self._score_text, self._score_rect)
+        return area
+
+    @staticmethod
+    def _place_text(surf: pygame.Surface, position: Point, text):
+        text_size = text.get_size()
+        x = position.x - text_size[0] / 2
+        y = position.y - text_size[1] / 2
+        return surf.blit(text, [x, y])
@@ -0,0 +1,297 @@
+import os
+
+import numpy as np
+import torch
+
+
+class ReplayMemory:
+    """Fixed-size ring buffer of transitions stored in preallocated numpy arrays.
+
+    Actions are stored as indices ([straight, right, left] -> 0, 1, 2). ``sample``
+    gathers a batch into reusable buffers and returns tensors that share memory
+    with them, so a batch is only valid until the next call to ``sample``.
+    """
+
+    def __init__(self, capacity, state_dim, seed=None):
+        self.capacity = capacity
+        self.state_dim = state_dim
+        self.rng = np.random.default_rng(seed)
+        self.position = 0  # next slot to write
+        self.size = 0
+        self._allocate()
+        self._batch = None
+
+    def _allocate(self):
+        self.states = np.zeros((self.capacity, self.state_dim), dtype=np.float32)
+        self.actions = np.zeros(self.capacity, dtype=np.int64)
+        self.rewards = np.zeros(self.capacity, dtype=np.float32)
+        self.next_states = np.zeros((self.capacity, self.state_dim), dtype=np.float32)
+        self.dones = np.zeros(self.capacity, dtype=bool)
+
+    def __len__(self):
+        return self.size
+
+    def push(self, state, action, reward, next_state, done):
+        i = self.position
+        self.states[i] = state
+        self.actions[i] = action if np.ndim(action) == 0 else np.argmax(action)
+        self.rewards[i] = reward
+        self.next_states[i] = next_state
+        self.dones[i] = done
+        self.position = (i + 1) % self.capacity
+        self.size = min(self.size + 1, self.capacity)
+
+    def sample_indices(self, batch_size):
+        if self.size > batch_size:
+            return self.rng.choice(self.size, batch_size, replace=False)
+        return np.arange(self.size)
+
+    def sample(self, batch_size):
+        return self.gather(self.sample_indices(batch_size))
+
+    def gather(self, idx):
+        n = len(idx)
+        if self._batch is None or len(self._batch[0]) < n:
+            self._batch = (np.empty((n, self.state_dim), dtype=np.float32),
+                           np.empty(n, dtype=np.int64),
+                           np.empty(n, dtype=np.float32),
+                           np.empty((n, self.state_dim), dtype=np.float32),
+                           np.empty(n, dtype=bool))
+        sources = (self.states, self.actions, self.rewards, self.next_states, self.dones)
+        batch = []
+        for source, buffer in zip(sources, self._batch):
+            np.take(source, idx, axis=0, out=buffer[:n])
+            batch.append(torch.from_numpy(buffer[:n]))
+        return tuple(batch)
+
+
+class SumTree:
+    """Binary tree over ``capacity`` leaves where each node holds the sum of its children.
+
+    Leaves live at ``tree[leaves:]`` and the root at ``tree[1]``, so finding the
+    leaf under a prefix sum and updating a priority are both O(log n).
+    """
+
+    def __init__(self, capacity):
+        self.leaves = 1 << max(0, (capacity - 1).bit_length())
+        self.depth = self.leaves.bit_length() - 1
+        self.tree = np.zeros(2 * self.leaves, dtype=np.float64)
+
+    @property
+    def total(self) -> float:
+        return self.tree[1]
+
+    def __getitem__(self, idx):
+        return self.tree[np.asarray(idx) + self.leaves]
+
+    def set(self, idx, priority):
+        i = idx + self.leaves
+        tree = self.tree
+        tree[i] = priority
+        i //= 2
+        while i:
+            tree[i] = tree[2 * i] + tree[2 * i + 1]
+            i //= 2
+
+    def update(self, idx, priorities):
+        # batched set: write the leaves, then refresh each level's touched parents once
+        idx = np.asarray(idx, dtype=np.int64) + self.leaves
+        self.tree[idx] = priorities
+        for _ in range(self.depth):
+            idx = np.unique(idx // 2)
+            self.tree[idx] = self.tree[2 * idx] + self.tree[2 * idx + 1]
+
+    def find(self, values):
+        # leaf index whose prefix-sum interval contains each value
+        values = np.asarray(values, dtype=np.float64).copy()
+        idx = np.ones(len(values), dtype=np.int64)
+        for _ in range(self.depth):
+            left = 2 * idx
+            go_right = values >= self.tree[left]
+            values -= np.where(go_right, self.tree[left], 0.0)
+            idx = np.where(go_right, left + 1, left)
+        return idx - self.leaves
+
+
+class PrioritizedReplayMemory(ReplayMemory):
+    """ReplayMemory sampled in proportion to priority (|TD error| + eps) ** alpha.
+
+    ``sample`` also returns the sampled indices and importance-sampling weights,
+    normalised to a max of 1, with beta annealed towards 1 on every call.
+    Feed the TD errors of the batch back through ``update_priorities``.
+    """
+
+    def __init__(self, capacity, state_dim, alpha=0.6, beta=0.4, beta_increment=0.001, eps=1e-3, seed=None):
+        super().__init__(capacity, state_dim, seed=seed)
+        self.alpha = alpha
+        self.beta = beta
+        self.beta_increment = beta_increment
+        self.eps = eps
+        self.tree = SumTree(capacity)
+        self.max_priority = 1.0
+
+    def push(self, state, action, reward, next_state, done):
+        # new transitions get the highest priority seen so they are replayed at least once
+        self.tree.set(self.position, self.max_priority)
+        super().push(state, action, reward, next_state, done)
+
+    def sample_indices(self, batch_size):
+        n = min(batch_size, self.size)
+        # one draw per equal slice of the total priority mass
+        total = self.tree.total
+        bounds = np.arange(n) * (total / n)
+        values = np.minimum(bounds + self.rng.random(n) * (total / n), np.nextafter(total, 0))
+        return np.minimum(self.tree.find(values), self.size - 1)
+
+    def sample(self, batch_size):
+        idx = self.sample_indices(batch_size)
+        probs = self.tree[idx] / self.tree.total
+        weights = (self.size * probs) ** -self.beta
+        weights /= weights.max()
+        self.beta = min(1.0, self.beta + self.beta_increment)
+        return self.gather(idx) + (idx, torch.from_numpy(weights.astype(np.float32)))
+
+    def update_priorities(self, idx, td_errors):
+        priorities = (np.abs(np.asarray(td_errors, dtype=np.float64)) + self.eps) ** self.alpha
+        self.tree.update(idx, priorities)
+        self.max_priority = max(self.max_priority, priorities.max())
+
+
+class SharedReplayMemory(ReplayMemory):
+    """ReplayMemory in shared memory that several processes can write to at once.
+
+    The slots are split into one shard per writer; a writer sets ``shard`` and
+    only ever touches its own slots and counters, so pushes need no locking.
+    Any process can sample across all shards. The object can be passed to
+    torch.multiprocessing children, which attach to the same memory.
+    """
+
+    def __init__(self, capacity, state_dim, shards, seed=None):
+        self.shards = shards
+        self.shard_capacity = capacity // shards
+        self.capacity = self.shard_capacity * shards
+        self.state_dim = state_dim
+        self.rng = np.random.default_rng(seed)
+        self.shard = 0
+        self._tensors = (torch.zeros((self.capacity, state_dim), dtype=torch.float32),
+                         torch.zeros(self.capacity, dtype=torch.int64),
+                         torch.zeros(self.capacity, dtype=torch.float32),
+                         torch.zeros((self.capacity, state_dim), dtype=torch.float32),
+                         torch.zeros(self.capacity, dtype=torch.bool),
+                         torch.zeros((shards, 2), dtype=torch.int64))  # per shard: position, size
+        for tensor in self._tensors:
+            tensor.share_memory_()
+        self._attach()
+
+    def _attach(self):
+        (self.states, self.actions, self.rewards, self.next_states, self.dones,
+         self._counters) = (tensor.numpy() for tensor in self._tensors)
+        self._batch = None
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        for name in ('states', 'actions', 'rewards', 'next_states', 'dones', '_counters', '_batch'):
+            del state[name]
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._attach()
+
+    @property
+    def size(self):
+        return int(self._counters[:, 1].sum())
+
+    @property
+    def position(self):
+        return int(self._counters[self.shard, 0])
+
+    def push(self, state, action, reward, next_state, done):
+        counters = self._counters[self.shard]
+        pos = int(counters[0])
+        i = self.shard * self.shard_capacity + pos
+        self.states[i] = state
+        self.actions[i] = action if np.ndim(action) == 0 else np.argmax(action)
+        self.rewards[i] = reward
+        self.next_states[i] = next_state
+        self.dones[i] = done
+        # publish the slot only after it has been written
+        counters[1] = min(int(counters[1]) + 1, self.shard_capacity)
+        counters[0] = (pos + 1) % self.shard_capacity
+
+    def sample_indices(self, batch_size):
+        sizes = self._counters[:, 1].copy()
+        total = int(sizes.sum())
+        ranks = self.rng.choice(total, batch_size, replace=False) if total > batch_size else np.arange(total)
+        # map a rank over the filled slots of all shards to its slot
+        ends = np.cumsum(sizes)
+        shard = np.searchsorted(ends, ranks, side='right')
+        return shard * self.shard_capacity + ranks - (ends[shard] - sizes[shard])
+
+
+class MemmapReplayMemory(ReplayMemory):
+    """ReplayMemory kept in ``numpy.memmap`` files under ``path`` so it outlives the process.
+
+    Each field is a .npy file mapped into memory and ``meta.npy`` holds the
+    capacity, state size, write position and fill count, so reopening a store
+    only parses the small .npy headers and sampling reads straight from the
+    mapped pages. The store can be bigger than RAM. Open with ``mode='r'`` to
+    sample from a store another process is writing (or has written); only one
+    process should write to a store at a time.
+    """
+    FIELDS = ('states', 'actions', 'rewards', 'next_states', 'dones')
+
+    def __init__(self, path, capacity=None, state_dim=None, mode='r+', seed=None):
+        self.path = path
+        self.rng = np.random.default_rng(seed)
+        self._batch = None
+        meta_path = os.path.join(path, 'meta.npy')
+        if os.path.exists(meta_path):
+            self._meta = np.load(meta_path, mmap_mode=mode)
+            if (capacity or self._meta[0]) != self._meta[0] or (state_dim or self._meta[1]) != self._meta[1]:
+                raise ValueError(f'{path} holds a ({self._meta[0]}, {self._meta[1]}) memory, '
+                                 f'not ({capacity}, {state_dim})')
+            self.capacity, self.state_dim = int(self._meta[0]), int(self._meta[1])
+            for name in self.FIELDS:
+                setattr(self, name, np.load(os.path.join(path, name + '.npy'), mmap_mode=mode))
+        else:
+            if mode == 'r':
+                raise FileNotFoundError(meta_path)
+            if capacity is None or state_dim is None:
+                raise ValueError('capacity and state_dim are needed to create a new memory')
+            os.makedirs(path, exist_ok=True)
+            self.capacity, self.state_dim = capacity, state_dim
+            shapes = {'states': ((capacity, state_dim), np.float32),
+                      'actions': ((capacity,), np.int64),
+                      'rewards': ((capacity,), np.float32),
+                      'next_states': ((capacity, state_dim), np.float32),
+                      'dones': ((capacity,), np.bool_)}
+            for name in self.FIELDS:
+                shape, dtype = shapes[name]
+                setattr(self, name, np.lib.format.open_memmap(os.path.join(path, name + '.npy'),
+                                                              mode='w+', dtype=dtype, shape=shape))
+            # written last: a store without meta.npy is incomplete and gets recreated
+            self._meta = np.lib.format.open_memmap(meta_path, mode='w+', dtype=np.int64, shape=(4,))
+            self._meta[:] = (capacity, state_dim, 0, 0)
+
+    @property
+    def position(self):
+        return int(self._meta[2])
+
+    @position.setter
+    def position(self, value):
+        self._meta[2] = value
+
+    @property
+    def size(self):
+        return int(self._meta[3])
+
+    @size.setter
+    def size(self, value):
+        self._meta[3] = value
+
+    def flush(self):
+        """Push written pages to disk."""
+        for name in self.FIELDS:
+            getattr(self, name).flush()
+        self._meta.flush()
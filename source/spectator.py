@@ -0,0 +1,215 @@
+import multiprocessing as mp
+import queue
+
+import numpy as np
+
+from game import BLOCK_SIZE
+from game import Direction
+from game import Point
+
+# Messages sent to the viewer process, all plain tuples of ints and arrays:
+#   ('frame', cols, rows, body, food, score)      body: cell indices, head first
+#   ('replay', cols, rows, body, food, moves, score)  moves: (head, food) cell per step after ``body``
+#   ('score', score)                              a game ended; added to the score plot
+# Cells are row-major indices y * cols + x, as in SnakeGameAI.grid.
+
+
+class Spectator:
+    """Streams a decimated view of training to a viewer process without ever blocking.
+
+    Attach it to a SnakeGameAI (``game.attach(spectator)``) or call ``vec_step``
+    after each VecSnakeGame.step. Every ``every``-th step of every
+    ``episodes``-th game is sent as a frame; if the queue is full the frame is
+    dropped. Each game is also logged as its start body plus one (head, food)
+    pair per step, and a game that beats the best score so far is sent whole,
+    so the viewer can replay it.
+    """
+
+    def __init__(self, queue, every=10, episodes=1, replay_records=True):
+        self.queue = queue
+        self.every = every
+        self.episodes = episodes
+        self.replay_records = replay_records
+        self.record = 0
+        self.dropped = 0
+        self._episode = 0
+        self._steps = 0
+        self._start = None
+        self._start_food = 0
+        self._moves = []
+        self._score = 0
+        self._cols = 0
+        self._rows = 0
+
+    def send(self, message):
+        try:
+            self.queue.put_nowait(message)
+        except (queue.Full, ValueError, OSError):  # full, or the viewer is gone
+            self.dropped += 1
+
+    # SnakeGameAI observer
+
+    def on_reset(self, game):
+        self._end_episode()
+        self._start_episode(game.cols, game.rows, game_body(game), game._cell(game.food))
+
+    def on_step(self, game):
+        food = game._cell(game.food)
+        if self._start is None:  # attached mid game: follow it from here
+            self._start_episode(game.cols, game.rows, game_body(game), food)
+            return
+        self._step(game._cell(game.head), food, game.score, lambda: game_body(game))
+
+    # VecSnakeGame
+
+    def vec_step(self, env, done, score, index=0):
+        """Follow game ``index`` of a VecSnakeGame; call with what ``step`` returned."""
+        food = int(env.food[index, 1] * env.cols + env.food[index, 0])
+        if self._start is None or done[index]:
+            if self._start is not None:
+                self._score = int(score[index])
+                self._end_episode()
+            self._start_episode(env.cols, env.rows, vec_body(env, index), food)
+            return
+        head = int(env.heads[index, 1] * env.cols + env.heads[index, 0])
+        self._step(head, food, int(env.score[index]), lambda: vec_body(env, index))
+
+    def close(self):
+        self.send(None)
+
+    def _start_episode(self, cols, rows, body, food):
+        self._cols = cols
+        self._rows = rows
+        self._start = body
+        self._start_food = food
+        self._moves = []
+        self._score = 0
+        self._steps = 0
+
+    def _step(self, head, food, score, body):
+        if self.replay_records:
+            self._moves.append((head, food))
+        self._score = score
+        self._steps += 1
+        if self._episode % self.episodes == 0 and self._steps % self.every == 0:
+            self.send(('frame', self._cols, self._rows, body(), food, score))
+
+    def _end_episode(self):
+        if self._start is None:
+            return
+        self._episode += 1
+        self.send(('score', self._score))
+        if self.replay_records and self._score > self.record:
+            self.record = self._score
+            moves = np.array(self._moves, dtype=np.int32).reshape(-1, 2)
+            self.send(('replay', self._cols, self._rows, self._start, self._start_food, moves, self._score))
+        self._start = None
+
+
+def replay_frames(body, food, moves):
+    """(body, food, score) after each move of a logged game; body is a list of cells, head first."""
+    body = [int(cell) for cell in body]
+    score = 0
+    for head, next_food in moves:
+        if head == food:
+            score += 1
+        else:
+            body.pop()
+        body.insert(0, int(head))
+        food = int(next_food)
+        yield body, food, score
+
+
+def game_body(game):
+    return np.array([game._cell(pt) for pt in game.snake], dtype=np.int32)
+
+
+def vec_body(env, index):
+    idx = (env.head_idx[index] - np.arange(env.length[index])) % env.capacity
+    cells = env.body[index, idx]
+    return (cells[:, 1] * env.cols + cells[:, 0]).astype(np.int32)
+
+
+def start_viewer(ctx=None, maxsize=16, fps=30, replay_fps=20):
+    """Spawn the viewer window; returns (queue, process). Pass ``ctx`` to share a multiprocessing context."""
+    ctx = ctx or mp.get_context('spawn')
+    q = ctx.Queue(maxsize=maxsize)
+    process = ctx.Process(target=run_viewer, args=(q, fps, replay_fps), daemon=True)
+    process.start()
+    return q, process
+
+
+def stop_viewer(spectator, process, timeout=2):
+    spectator.close()
+    process.join(timeout=timeout)
+    if process.is_alive():
+        process.terminate()
+
+
+def run_viewer(q, fps=30, replay_fps=20):
+    """Viewer process: show the newest frame, play record games as they arrive, plot the scores."""
+    # pygame is only ever imported in this process
+    import pygame
+    from game import SnakeGameAI
+
+    game = None
+    scores = []  # until the window is open
+    replay = None  # the record game being played back
+    caption = 'Snake'
+    frame = None
+    while True:
+        # take everything queued; only the newest frame is drawn
+        try:
+            while True:
+                message = q.get(block=game is None)
+                if message is None:
+                    pygame.quit()
+                    return
+                kind, *data = message
+                if kind == 'frame':
+                    frame = data
+                elif kind == 'replay':
+                    cols, rows, body, food, moves, score = data
+                    replay = replay_frames(body, food, moves)
+                    caption = f'Snake - replay of record {score}'
+                elif kind == 'score':
+                    if game is None:
+                        scores.append(data[0])
+                    else:
+                        game.add_plot_score(data[0])
+                if game is None and kind in ('frame', 'replay'):
+                    game = SnakeGameAI(w=data[0] * BLOCK_SIZE, h=data[1] * BLOCK_SIZE)
+                    game.update_plot_data(scores)
+        except queue.Empty:
+            pass
+
+        paused = game.read_input()[0]
+        if not paused:
+            if replay is not None:
+                try:
+                    body, food, score = next(replay)
+                    pygame.display.set_caption(caption)
+                    _show(game, _points(body, game.cols), _point(food, game.cols), score)
+                except StopIteration:
+                    replay = None
+                    pygame.display.set_caption('Snake')
+            elif frame is not None:
+                cols, rows, body, food, score = frame
+                _show(game, _points(body, cols), _point(food, cols), score)
+                frame = None
+        game.renderer.clock.tick(replay_fps if replay is not None else fps)
+
+
+def _point(cell, cols):
+    return Point((cell % cols) * BLOCK_SIZE, (cell // cols) * BLOCK_SIZE)
+
+
+def _points(cells, cols):
+    return [_point(int(cell), cols) for cell in cells]
+
+
+def _show(game, points, food, score):
+    game.set_snake(points, Direction.RIGHT)
+    game.food = food
+    game.score = score
+    game.renderer.redraw()
@@ -0,0 +1,221 @@
+import argparse
+import csv
+import itertools
+import json
+import math
+import multiprocessing as mp
+import os
+import random
+import time
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures import as_completed
+
+import numpy as np
+import torch
+
+from agent import Agent
+from agent import check_agent_options
+from evaluate import play_episode
+from evaluate import summarize
+from export import NumpyQNet
+from features import ReachabilityCache
+from game import REWARDS
+from game import SnakeGameAI
+from metrics import Metrics
+from model import MODEL_DIR
+
+# sweepable Agent arguments; reward table entries are swept as 'rewards.<key>', e.g. 'rewards.self'.
+# Jobs train on SnakeGameAI, the only environment that takes a reward table: VecSnakeGame and
+# BitboardSnake keep the fixed HIT_WALL / ATE_FOOD rewards and are not used here.
+AGENT_PARAMS = ('lr', 'gamma', 'batch_size', 'max_memory', 'prioritized', 'extended_state', 'q_table_every')
+
+EXAMPLE_SPEC = {
+    'search': 'grid',  # or 'random', drawing 'samples' configs
+    'params': {'lr': [0.001, 0.0005], 'gamma': [0.9, 0.95], 'rewards.self': [-9, -20]},
+    'seeds': [0],  # every config is trained once per seed
+    'budget': {'steps': 200_000, 'seconds': 1800},  # whichever comes first
+    'eval_episodes': 100,
+    'size': [1280, 760],
+}
+
+
+def _draw(values, rng):
+    # a list is a set of choices; {'low', 'high', 'log'} is a range, for random search
+    if isinstance(values, dict):
+        low, high = values['low'], values['high']
+        if values.get('log'):
+            value = math.exp(rng.uniform(math.log(low), math.log(high)))
+        else:
+            value = rng.uniform(low, high)
+        return round(value) if isinstance(low, int) and isinstance(high, int) else value
+    return rng.choice(values)
+
+
+def expand(spec):
+    """The jobs of a sweep spec: one dict per config and seed, with the budget and eval settings of the spec."""
+    params = spec.get('params', {})
+    for name in params:
+        if name not in AGENT_PARAMS and not (name.startswith('rewards.') and name[8:] in REWARDS):
+            raise ValueError(f'cannot sweep {name!r}: expected one of {AGENT_PARAMS} '
+                             f'or rewards.<{"|".join(REWARDS)}>')
+
+    search = spec.get('search', 'grid')
+    if search == 'grid':
+        if any(isinstance(values, dict) for values in params.values()):
+            raise ValueError('grid search needs a list of values for every parameter')
+        configs = [dict(zip(params, combo)) for combo in itertools.product(*params.values())]
+    elif search == 'random':
+        rng = random.Random(spec.get('search_seed', 0))
+        configs = [{name: _draw(values, rng) for name, values in params.items()}
+                   for _ in range(spec.get('samples', 10))]
+    else:
+        raise ValueError(f'unknown search {search!r}, expected grid or random')
+
+    for config in configs:
+        try:
+            check_agent_options(**{k: v for k, v in config.items() if k in AGENT_PARAMS})
+        except ValueError as e:
+            raise ValueError(f'config {config}: {e}') from None
+
+    budget = spec.get('budget', {})
+    if not budget.get('steps') and not budget.get('seconds'):
+        raise ValueError('a sweep needs a budget of steps or seconds per job')
+    w, h = spec.get('size', (1280, 760))
+    return [{'job': i, 'config': config, 'seed': seed,
+             'max_steps': budget.get('steps'), 'max_seconds': budget.get('seconds'),
+             'eval_episodes': spec.get('eval_episodes', 100), 'eval_seed': spec.get('eval_seed', 10_000),
+             'w': w, 'h': h}
+            for i, (config, seed) in enumerate(itertools.product(configs, spec.get('seeds', [0])))]
+
+
+def run_job(job, model_dir=None):
+    """Train one config headless until its budget runs out, then play greedy games on the eval boards.
+
+    Returns the job with its results: training statistics, the learning curve
+    as [steps, score] per game, and the eval score summary. Eval boards are the
+    same for every job, so eval scores compare configs directly.
+    """
+    torch.set_num_threads(1)
+    random.seed(job['seed'])
+    np.random.seed(job['seed'])
+    torch.manual_seed(job['seed'])
+
+    rewards = {k[8:]: v for k, v in job['config'].items() if k.startswith('rewards.')}
+    agent = Agent(seed=job['seed'], **{k: v for k, v in job['config'].items() if k in AGENT_PARAMS})
+    game = SnakeGameAI(w=job['w'], h=job['h'], headless=True, rewards=rewards)
+    metrics = Metrics()
+    curve = []
+    max_steps = job['max_steps'] or math.inf
+    deadline = time.perf_counter() + (job['max_seconds'] or math.inf)
+
+    start = time.perf_counter()
+    steps = 0
+    state_old = agent.get_state(game)
+    while steps < max_steps and (steps % 256 or time.perf_counter() < deadline):
+        final_move = agent.get_action(state_old)
+        reward, done, score = game.play_step(final_move)
+        state_new = agent.get_state(game)
+        agent.train_short_memory(state_old, final_move, reward, state_new, done)
+        agent.remember(state_old, final_move, reward, state_new, done)
+        steps += 1
+        if done:
+            game.reset()
+            state_new = agent.get_state(game)
+            agent.n_games += 1
+            agent.train_long_memory()
+            metrics.add(score)
+            curve.append([steps, score])
+        state_old = state_new
+    train_seconds = time.perf_counter() - start
+
+    if model_dir:
+        torch.save(agent.model.state_dict(), os.path.join(model_dir, f'job-{job["job"]:04d}.pth'))
+    policy = NumpyQNet.from_state_dict(agent.model.state_dict())
+    cache = ReachabilityCache() if agent.extended_state else None
+    scores = [play_episode(policy, seed, job['w'], job['h'], cache)['score']
+              for seed in range(job['eval_seed'], job['eval_seed'] + job['eval_episodes'])]
+
+    return {**job, 'steps': steps, 'games': metrics.n_games, 'train_seconds': train_seconds,
+            'train_record': metrics.record, 'train_rolling_mean': metrics.rolling_mean,
+            'eval': summarize(scores) if scores else None, 'curve': curve}
+
+
+def table_row(result):
+    """The results table columns of a job: its parameters and the headline numbers, no curve.
+
+    A failed job has only its parameters and the error.
+    """
+    row = {'job': result['job'], 'seed': result['seed'], **result['config']}
+    for key in ('steps', 'games', 'train_seconds', 'train_record', 'train_rolling_mean', 'error'):
+        if key in result:
+            row[key] = result[key]
+    for key, value in (result.get('eval') or {}).items():
+        row[f'eval_{key}'] = value
+    return row
+
+
+def sweep(spec, output=os.path.join(MODEL_DIR, 'sweep'), workers=None, save_models=False):
+    """Run every job of ``spec`` over a process pool, best eval mean first in the returned table.
+
+    Results are written to ``output``/results.jsonl as jobs finish, curves
+    included, so a long sweep that is stopped keeps what it finished;
+    ``output``/results.csv is the table of every job without the curves.
+    A job that raises is logged with its error and does not stop the others.
+    """
+    jobs = expand(spec)
+    workers = min(workers or os.cpu_count(), len(jobs))
+    os.makedirs(output, exist_ok=True)
+    with open(os.path.join(output, 'spec.json'), 'w') as f:
+        json.dump(spec, f, indent=2)
+    model_dir = output if save_models else None
+
+    rows = []
+    with open(os.path.join(output, 'results.jsonl'), 'w', buffering=1) as log, \
+            ProcessPoolExecutor(workers, mp_context=mp.get_context('spawn')) as pool:
+        futures = {pool.submit(run_job, job, model_dir): job for job in jobs}
+        for future in as_completed(futures):
+            job = futures[future]
+            try:
+                result = future.result()
+            except Exception as e:
+                result = {**job, 'error': f'{type(e).__name__}: {e}'}
+            log.write(json.dumps(result) + '\n')
+            rows.append(table_row(result))
+            if 'error' in result:
+                summary = f'failed: {result["error"]}'
+            else:
+                eval_mean = result['eval']['mean'] if result['eval'] else float('nan')
+                summary = f'{result["steps"]} steps, {result["games"]} games, eval mean {eval_mean:.2f}'
+            print(f'[{len(rows)}/{len(jobs)}] job {job["job"]} {job["config"]} seed {job["seed"]}: {summary}')
+
+    rows.sort(key=lambda row: -row.get('eval_mean', -math.inf))
+    columns = list(dict.fromkeys(key for row in rows for key in row))
+    with open(os.path.join(output, 'results.csv'), 'w', newline='') as f:
+        writer = csv.DictWriter(f, columns)
+        writer.writeheader()
+        writer.writerows(rows)
+    return rows
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Train many configs headless in parallel and compare them.')
+    parser.add_argument('spec', nargs='?', default=None,
+                        help='JSON sweep spec (default: a small example grid, printed with --example)')
+    parser.add_argument('--example', action='store_true', help='print the example spec and exit')
+    parser.add_argument('--workers', type=int, default=None, help='worker processes (default: cpu count)')
+    parser.add_argument('--output', default=os.path.join(MODEL_DIR, 'sweep'),
+                        help='directory for results.jsonl and results.csv (default: models/sweep)')
+    parser.add_argument('--save-models', action='store_true', help='keep the trained weights of every job')
+    args = parser.parse_args()
+
+    if args.example:
+        print(json.dumps(EXAMPLE_SPEC, indent=2))
+    else:
+        if args.spec:
+            with open(args.spec) as f:
+                spec = json.load(f)
+        else:
+            spec = EXAMPLE_SPEC
+        table = sweep(spec, args.output, workers=args.workers, save_models=args.save_models)
+        for row in table[:10]:
+            print(row)
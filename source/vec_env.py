@@ -0,0 +1,135 @@
+import numpy as np
+
+from game import BLOCK_SIZE
+from game import HIT_WALL
+from game import ATE_FOOD
+
+# direction indices follow game.CLOCK_WISE: right, down, left, up
+DIR_RIGHT = 0
+DIR_DOWN = 1
+DIR_LEFT = 2
+DIR_UP = 3
+DIR_DELTAS = np.array([[1, 0], [0, 1], [-1, 0], [0, -1]], dtype=np.int64)  # (dx, dy) in cells
+
+# action indices: [straight, right, left] -> change of direction index
+TURNS = np.array([0, 1, -1], dtype=np.int64)
+
+
+class VecSnakeGame:
+    """N headless snake games stored in NumPy arrays and stepped together.
+
+    Positions are in grid cells (pixel / BLOCK_SIZE). Each body is a ring buffer
+    of cells: ``body[n, head_idx[n]]`` is the head and the tail sits ``length - 1``
+    slots behind it. ``occupancy[n, y, x]`` is 1 where game n has a body segment.
+    Games that end are reset automatically inside ``step``.
+    """
+
+    def __init__(self, n, w=1280, h=760, seed=None):
+        self.n = n
+        self.w = w
+        self.h = h
+        self.cols = w // BLOCK_SIZE
+        self.rows = h // BLOCK_SIZE
+        self.cells = self.cols * self.rows
+        self.capacity = self.cells + 1  # head is inserted before the tail is popped
+        self.rng = np.random.default_rng(seed)
+
+        self.heads = np.zeros((n, 2), dtype=np.int64)
+        self.directions = np.zeros(n, dtype=np.int64)
+        self.body = np.zeros((n, self.capacity, 2), dtype=np.int64)
+        self.head_idx = np.zeros(n, dtype=np.int64)
+        self.length = np.zeros(n, dtype=np.int64)
+        self.occupancy = np.zeros((n, self.rows, self.cols), dtype=np.uint8)
+        self.food = np.zeros((n, 2), dtype=np.int64)
+        self.score = np.zeros(n, dtype=np.int64)
+        self.frame_iterations = np.zeros(n, dtype=np.int64)
+
+        self._arange = np.arange(n)
+        self.reset()
+
+    def reset(self, mask=None):
+        """Reset the games selected by the boolean ``mask`` (all games if None)."""
+        envs = self._arange if mask is None else np.flatnonzero(mask)
+        if len(envs) == 0:
+            return
+
+        # same start as SnakeGameAI.reset: head in the middle, moving right, 3 long
+        hx, hy = self.cols // 2, self.rows // 2
+        self.occupancy[envs] = 0
+        self.directions[envs] = DIR_RIGHT
+        self.heads[envs] = (hx, hy)
+        self.head_idx[envs] = 2
+        self.length[envs] = 3
+        for i in range(3):
+            self.body[envs, 2 - i] = (hx - i, hy)
+            self.occupancy[envs, hy, hx - i] = 1
+        self.score[envs] = 0
+        self.frame_iterations[envs] = 0
+        self._place_food(envs)
+
+    def _place_food(self, envs):
+        # uniform draw over the free cells of each game: random keys, occupied cells masked out
+        keys = self.rng.random((len(envs), self.cells))
+        keys[self.occupancy[envs].reshape(len(envs), -1) != 0] = -1.0
+        cell = keys.argmax(axis=1)
+        self.food[envs, 0] = cell % self.cols
+        self.food[envs, 1] = cell // self.cols
+        return keys[np.arange(len(envs)), cell] >= 0  # False where the board is full
+
+    def step(self, actions):
+        """Advance every game by one move.
+
+        ``actions`` is either an (N,) array of action indices (0 straight, 1 right,
+        2 left) or an (N, 3) one-hot array like the one SnakeGameAI.play_step takes.
+        Returns (reward, done, score) arrays; ``score`` is the score the game had
+        when the step finished, before any automatic reset.
+        """
+        actions = np.asarray(actions)
+        if actions.ndim == 2:
+            actions = actions.argmax(axis=1)
+        envs = self._arange
+
+        self.frame_iterations += 1
+
+        # move
+        self.directions = (self.directions + TURNS[actions]) % 4
+        new_heads = self.heads + DIR_DELTAS[self.directions]
+        x = new_heads[:, 0]
+        y = new_heads[:, 1]
+        self.length += 1
+
+        # check if game over; the tail has not been popped yet, as in play_step
+        out = (x < 0) | (x >= self.cols) | (y < 0) | (y >= self.rows)
+        hit_self = np.zeros(self.n, dtype=bool)
+        inside = ~out
+        hit_self[inside] = self.occupancy[envs[inside], y[inside], x[inside]] != 0
+        done = out | hit_self | (self.frame_iterations > 100 * self.length)
+
+        reward = np.zeros(self.n, dtype=np.int64)
+        reward[done] = HIT_WALL
+        alive = ~done
+
+        # insert the new head for the games still running
+        self.heads[alive] = new_heads[alive]
+        self.head_idx[alive] = (self.head_idx[alive] + 1) % self.capacity
+        self.body[alive, self.head_idx[alive]] = new_heads[alive]
+        self.occupancy[alive, y[alive], x[alive]] = 1
+
+        # place new food or just move
+        ate = alive & (x == self.food[:, 0]) & (y == self.food[:, 1])
+        self.score[ate] += 1
+        reward[ate] = ATE_FOOD
+        if ate.any():
+            eaters = np.flatnonzero(ate)
+            full = ~self._place_food(eaters)
+            done[eaters[full]] = True  # nowhere left to put food: the board is won
+
+        moved = alive & ~ate
+        tail_idx = (self.head_idx[moved] - self.length[moved] + 1) % self.capacity
+        tails = self.body[moved, tail_idx]
+        self.occupancy[moved, tails[:, 1], tails[:, 0]] = 0
+        self.length[moved] -= 1
+
+        score = self.score.copy()
+        self.reset(done)
+        return reward, done, score
@@ -0,0 +1,40 @@
+import multiprocessing as mp
+import queue
+import threading
+import time
+
+import numpy as np
+
+from actor_learner import actor
+from features import STATE_SIZE
+from qtable import QTable
+from replay import SharedReplayMemory
+
+
+class TestActor:
+    def test_fills_its_shard(self, model):
+        q_table = QTable()
+        q_table.refresh(model)
+        memory = SharedReplayMemory(200_000, STATE_SIZE, shards=2)  # no wrap-around before the actor stops
+        games = mp.Value('q', 1000)  # past the exploration phase: greedy moves only
+        steps = mp.Array('q', 2, lock=False)
+        results = queue.Queue()
+        stop = threading.Event()
+        thread = threading.Thread(target=actor, args=(1, memory, q_table, games, steps, results, stop, 0))
+        thread.start()
+        while steps[1] < 500:
+            time.sleep(0.01)
+        stop.set()
+        thread.join()
+
+        assert steps[0] == 0
+        n = min(steps[1], memory.shard_capacity)
+        rows = slice(memory.shard_capacity, memory.shard_capacity + n)
+        states, next_states = memory.states[rows], memory.next_states[rows]
+        assert set(np.unique(states)) <= {0.0, 1.0}
+        # greedy moves come from the table
+        assert np.array_equal(memory.actions[rows], q_table.actions[(states @ 2.0 ** np.arange(11)).astype(int)])
+        # transitions chain within a game: each state is the previous next state
+        running = ~memory.dones[rows][:-1].astype(bool)
+        assert np.array_equal(states[1:][running], next_states[:-1][running])
+        assert games.value - 1000 == results.qsize()
@@ -0,0 +1,36 @@
+import numpy as np
+import pytest
+import torch
+from agent import Agent
+
+
+class TestGetActions:
+    @pytest.fixture()
+    def agent(self) -> Agent:
+        torch.manual_seed(0)
+        np.random.seed(0)
+        yield Agent()
+
+    @pytest.fixture()
+    def states(self):
+        yield np.random.default_rng(0).integers(0, 2, (256, 11)).astype(np.float32)
+
+    def test_greedy_matches_model(self, agent, states):
+        agent.n_games = 1000  # epsilon < 0: no exploration
+        expected = agent.model(torch.from_numpy(states)).argmax(dim=1).numpy()
+        assert np.array_equal(agent.get_actions(states), expected)
+
+    def test_explores_per_row(self, agent, states):
+        agent.n_games = 1000
+        greedy = agent.get_actions(states)
+        agent.n_games = 0  # epsilon 80: about 40% random rows
+        actions = agent.get_actions(states)
+        assert actions.shape == (256,)
+        assert set(actions.tolist()) <= {0, 1, 2}
+        assert 0 < (actions != greedy).sum() < 256
+
+    def test_single_state_one_hot(self, agent, states):
+        agent.n_games = 1000
+        move = agent.get_action(states[0].astype(int))
+        assert sum(move) == 1
+        assert move.index(1) == agent.get_actions(states[:1])[0]
@@ -0,0 +1,27 @@
+from benchmark import bench_play_step, compare, hamiltonian_cycle, looped_game
+
+
+def report(**ops):
+    return {'results': [{'name': name, 'params': {}, 'ops_per_sec': v} for name, v in ops.items()]}
+
+
+class TestLoopedGame:
+    def test_cycle_covers_board(self):
+        cycle = hamiltonian_cycle(6, 4)
+        assert sorted(cycle) == sorted((x, y) for x in range(6) for y in range(4))
+        for (x0, y0), (x1, y1) in zip(cycle, cycle[1:] + cycle[:1]):
+            assert abs(x1 - x0) + abs(y1 - y0) == 1
+
+    def test_snake_survives_laps(self):
+        game, snake, actions = looped_game(160, 80, 20)
+        assert len(game.snake) == 20
+        step = bench_play_step(160, 80, 20)
+        for _ in range(5 * len(actions)):
+            step()
+
+
+class TestCompare:
+    def test_flags_slowdowns_only(self):
+        baseline = report(a=100.0, b=100.0, c=100.0)
+        results = report(a=85.0, b=50.0, c=300.0, d=1.0)
+        assert compare(results, baseline, tolerance=0.2) == [('b', {}, 0.5)]
@@ -0,0 +1,104 @@
+import random
+
+import numpy as np
+from bitboard import BitboardSnake, board_masks, flood_fill, grow, mask_from_grid
+from features import game_features
+from game import SnakeGameAI, Point, ATE_FOOD, BLOCK_SIZE
+
+
+def cells_to_mask(cells, cols):
+    mask = 0
+    for x, y in cells:
+        mask |= 1 << (y * cols + x)
+    return mask
+
+
+class TestBitboard:
+    def test_masks(self):
+        full, not_first_col, not_last_col = board_masks(3, 2)
+        assert full == 0b111111
+        assert not_first_col == 0b110110
+        assert not_last_col == 0b011011
+
+    def test_grow_does_not_wrap_rows(self):
+        assert grow(cells_to_mask([(2, 0)], 3), 3, 2) == cells_to_mask([(2, 0), (1, 0), (2, 1)], 3)
+        assert grow(cells_to_mask([(0, 1)], 3), 3, 2) == cells_to_mask([(0, 1), (1, 1), (0, 0)], 3)
+
+    def test_flood_fill_stops_at_walls(self):
+        # 4 x 3 board split by a wall in column 1 with a gap at the bottom
+        wall = cells_to_mask([(1, 0), (1, 1)], 4)
+        free = board_masks(4, 3)[0] & ~wall
+        region = flood_fill(cells_to_mask([(0, 0)], 4), free, 4, 3)
+        assert region == free
+        wall |= cells_to_mask([(1, 2)], 4)
+        free = board_masks(4, 3)[0] & ~wall
+        region = flood_fill(cells_to_mask([(0, 0)], 4), free, 4, 3)
+        assert region == cells_to_mask([(0, 0), (0, 1), (0, 2)], 4)
+
+    def test_mask_from_grid(self):
+        grid = bytearray(12)
+        grid[0] = 1
+        grid[9] = 2
+        assert mask_from_grid(grid) == (1 << 0) | (1 << 9)
+
+
+def sync_food(game, state):
+    game.food = Point((state.food % state.cols) * BLOCK_SIZE, (state.food // state.cols) * BLOCK_SIZE)
+
+
+class TestBitboardSnake:
+    def test_matches_snake_game(self):
+        rng = np.random.default_rng(3)
+        for episode in range(20):
+            state = BitboardSnake(8, 6, seed=episode)
+            game = SnakeGameAI(w=160, h=120, headless=True)
+            sync_food(game, state)
+            done = False
+            while not done:
+                action = [0, 0, 0]
+                action[rng.choice(3, p=[0.6, 0.2, 0.2])] = 1
+                expected = game.play_step(action)
+                assert state.play_step(action) == expected
+                done = expected[1]
+                if not done:
+                    assert state.head == game._cell(game.head)
+                    assert state.tail == game._cell(game.snake[-1])
+                    assert state.body == mask_from_grid(game.grid)
+                    assert state.danger() == tuple(bool(v) for v in game_features(game)[:3])
+                    sync_food(game, state)
+
+    def test_from_game_and_copy(self):
+        game = SnakeGameAI(w=160, h=120, headless=True)
+        game.food = Point(0, 0)
+        for action in ([1, 0, 0], [0, 1, 0], [0, 1, 0]):
+            game.play_step(action)
+        state = BitboardSnake.from_game(game)
+        clone = state.copy()
+        assert clone.play_step(2) == (0, False, 0)
+        assert state.head == game._cell(game.head)
+        # follow the clone's move on the original: the trail must yield the same tail
+        game.play_step([0, 0, 1])
+        assert clone.body == mask_from_grid(game.grid)
+        assert clone.tail == game._cell(game.snake[-1])
+
+    def test_copies_draw_food_independently(self):
+        state = BitboardSnake(8, 6, seed=1)
+        state.food = state.head + 1
+        clone = state.copy()
+        assert clone.play_step(0)[0] == ATE_FOOD
+        sibling = state.copy()
+        assert sibling.play_step(0)[0] == ATE_FOOD
+        assert state.play_step(0)[0] == ATE_FOOD  # the clones did not advance the original's food draws
+        assert state.food == clone.food == sibling.food
+
+    def test_copy_is_plain_ints(self):
+        state = BitboardSnake(8, 6, seed=2)
+        clone = state.copy()
+        assert all(type(getattr(clone, name)) is int for name in BitboardSnake.__slots__)
+        assert not any(isinstance(getattr(clone, name), random.Random) for name in BitboardSnake.__slots__)
+        assert clone.rng == state.rng
+
+    def test_reachable(self):
+        state = BitboardSnake(8, 6)
+        assert state.reachable(1) == grow(1 << state.head, 8, 6) & ~state.body
+        assert state.reachable().bit_count() == 8 * 6 - 3
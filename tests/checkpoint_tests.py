@@ -0,0 +1,79 @@
+import os
+import random
+
+import numpy as np
+import torch
+from agent import Agent
+from checkpoint import CheckpointWriter, latest_checkpoint, load_checkpoint, make_checkpoint, model_snapshot, \
+    restore_checkpoint
+from model import Linear_QNet
+
+
+class TestCheckpoint:
+    def test_round_trip(self, tmp_path):
+        agent = Agent()
+        agent.n_games = 123
+        agent.trainer.train_step(np.ones(11), [1, 0, 0], 1.0, np.zeros(11), False)
+        random.seed(5)
+        writer = CheckpointWriter(folder=str(tmp_path))
+        writer.save(make_checkpoint(agent, record=7, plot_scores=[1, 7]))
+        writer.close()
+        expected_random = random.random()
+
+        path = latest_checkpoint(str(tmp_path))
+        assert os.path.basename(path) == 'checkpoint_000000123.pth'
+        restored = Agent()
+        stats = restore_checkpoint(restored, load_checkpoint(path))
+        assert stats == {'record': 7, 'plot_scores': [1, 7]}
+        assert restored.n_games == 123
+        assert random.random() == expected_random
+        for p, q in zip(agent.model.parameters(), restored.model.parameters()):
+            assert torch.equal(p, q)
+        assert restored.trainer.optimizer.state_dict()['state'].keys() == agent.trainer.optimizer.state_dict()['state'].keys()
+
+    def test_snapshot_is_detached_from_training(self):
+        agent = Agent()
+        checkpoint = make_checkpoint(agent)
+        with torch.no_grad():
+            agent.model.linear1.weight.add_(1.0)
+        assert not torch.equal(checkpoint['model_state_dic']['linear1.weight'], agent.model.linear1.weight)
+
+    def test_rotation_and_named_files(self, tmp_path):
+        agent = Agent()
+        writer = CheckpointWriter(folder=str(tmp_path), keep=2)
+        for n in range(5):
+            agent.n_games = n
+            writer.save(make_checkpoint(agent))
+            writer.flush()
+        writer.save(make_checkpoint(agent), 'model.pth')
+        writer.close()
+        assert sorted(os.listdir(tmp_path)) == ['checkpoint_000000003.pth', 'checkpoint_000000004.pth', 'model.pth']
+
+    def test_best_model_loads_as_weights(self, tmp_path):
+        # train() writes models/model.pth this way on every new record
+        agent = Agent()
+        writer = CheckpointWriter(folder=str(tmp_path))
+        writer.save(model_snapshot(agent.model), 'model.pth')
+        writer.close()
+        loaded = Linear_QNet(11, 256, 3)
+        loaded.load(str(tmp_path / 'model.pth'))
+        for p, q in zip(agent.model.parameters(), loaded.parameters()):
+            assert torch.equal(p, q)
+        assert set(torch.load(tmp_path / 'model.pth')) == set(agent.model.state_dict())
+
+    def test_load_accepts_checkpoint(self, tmp_path):
+        agent = Agent()
+        torch.save(make_checkpoint(agent), tmp_path / 'checkpoint.pth')
+        loaded = Linear_QNet(11, 256, 3)
+        loaded.load(str(tmp_path / 'checkpoint.pth'))
+        assert torch.equal(loaded.linear2.weight, agent.model.linear2.weight)
+
+    def test_failed_write_does_not_stop_writer(self, tmp_path, capsys):
+        writer = CheckpointWriter(folder=str(tmp_path))
+        writer.save({'n_games': 1, 'callback': lambda: None}, 'bad.pth')  # cannot be pickled
+        writer.flush()
+        writer.save({'n_games': 2}, 'good.pth')
+        writer.close()
+        assert 'bad.pth not saved' in capsys.readouterr().out
+        assert sorted(os.listdir(tmp_path)) == ['good.pth']
+        assert torch.load(tmp_path / 'good.pth') == {'n_games': 2}
@@ -0,0 +1,29 @@
+import os
+import sys
+
+# source/ is a flat script directory (modules import each other as `from game import ...`)
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'source'))
+
+import pytest  # noqa: E402
+import torch  # noqa: E402
+
+from game import SnakeGameAI  # noqa: E402
+from model import Linear_QNet  # noqa: E402
+
+
+@pytest.fixture()
+def game() -> SnakeGameAI:
+    """A headless 10 x 10 board."""
+    yield SnakeGameAI(w=200, h=200, headless=True)
+
+
+@pytest.fixture()
+def model() -> Linear_QNet:
+    """The default network, with weights fixed by seed."""
+    torch.manual_seed(0)
+    yield Linear_QNet(11, 256, 3)
+
+
+@pytest.fixture()
+def state_dict(model):
+    yield model.state_dict()
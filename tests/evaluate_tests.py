@@ -0,0 +1,28 @@
+import torch
+from evaluate import evaluate, play_episode
+from export import NumpyQNet
+from model import Linear_QNet, load_weights
+
+
+class TestEvaluate:
+    def test_report_matches_serial_games(self, tmp_path, model):
+        path = tmp_path / 'model.pth'
+        torch.save({'model_state_dic': model.state_dict()}, path)  # checkpoint layout
+
+        report = evaluate(str(path), episodes=6, workers=2, seed=10, w=200, h=200, chunk_size=2)
+
+        policy = NumpyQNet.from_state_dict(model.state_dict())
+        expected = [play_episode(policy, seed, 200, 200) for seed in range(10, 16)]
+        assert report['episodes'] == expected
+        assert report['n_episodes'] == 6
+        assert report['score']['max'] == max(e['score'] for e in expected)
+        assert report['steps']['min'] <= report['steps']['p50'] <= report['steps']['max']
+        assert sum(report['deaths'].values()) == 6
+        assert set(report['deaths']) <= {'wall', 'self', 'timeout', 'won'}
+
+    def test_load_weights_formats(self, tmp_path):
+        model = Linear_QNet(17, 32, 3)
+        torch.save(model.state_dict(), tmp_path / 'plain.pth')
+        loaded = Linear_QNet.from_state_dict(load_weights(str(tmp_path / 'plain.pth')))
+        assert loaded.linear1.in_features == 17
+        assert torch.equal(loaded.linear2.weight, model.linear2.weight)
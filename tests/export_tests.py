@@ -0,0 +1,63 @@
+import numpy as np
+import pytest
+import torch
+
+from agent import Agent
+from evaluate import evaluate
+from export import KINDS, NumpyQNet, TorchPolicy, export, load_policy, parity, parity_states
+from model import Linear_QNet
+
+
+class TestExport:
+    @pytest.mark.parametrize('kind', sorted(KINDS))
+    def test_round_trip(self, tmp_path, state_dict, kind):
+        path = str(tmp_path / ('model' + KINDS[kind]))
+        exported = export(state_dict, path, kind)
+        loaded = load_policy(path)
+        assert loaded.in_features == 11
+        states = parity_states(11)
+        assert np.allclose(loaded.q_values(states), exported.q_values(states))
+        assert parity(state_dict, loaded)['agreement'] >= 0.99
+
+    def test_float_exports_match_model(self, tmp_path, state_dict):
+        for kind in ('numpy', 'torchscript'):
+            result = parity(state_dict, export(state_dict, str(tmp_path / ('m' + KINDS[kind])), kind))
+            assert result['states'] == 2048
+            assert result['agreement'] == 1.0
+            assert result['max_abs_diff'] < 1e-5
+
+    def test_act_is_greedy(self, state_dict):
+        policy = NumpyQNet.from_state_dict(state_dict)
+        model = Linear_QNet.from_state_dict(state_dict)
+        for state in parity_states(11)[::97]:
+            with torch.no_grad():
+                assert policy.act(state) == int(model(torch.from_numpy(state)).argmax())
+
+    def test_load_policy_from_checkpoint(self, tmp_path, state_dict):
+        torch.save({'model_state_dic': state_dict}, tmp_path / 'checkpoint.pth')
+        policy = load_policy(str(tmp_path / 'checkpoint.pth'))
+        assert isinstance(policy, NumpyQNet)
+        assert np.array_equal(policy.w2, state_dict['linear2.weight'].numpy())
+
+    def test_extended_state_size(self, tmp_path):
+        state_dict = Linear_QNet(17, 32, 3).state_dict()
+        policy = export(state_dict, str(tmp_path / 'm.pt'), 'torchscript')
+        assert isinstance(policy, TorchPolicy)
+        assert load_policy(str(tmp_path / 'm.pt')).in_features == 17
+        assert parity(state_dict, policy)['agreement'] == 1.0
+
+    def test_evaluate_exported_model(self, tmp_path, state_dict):
+        torch.save(state_dict, tmp_path / 'model.pth')
+        export(state_dict, str(tmp_path / 'model.npz'))
+        expected = evaluate(str(tmp_path / 'model.pth'), episodes=2, workers=1, w=200, h=200)
+        report = evaluate(str(tmp_path / 'model.npz'), episodes=2, workers=1, w=200, h=200)
+        assert report['episodes'] == expected['episodes']
+
+    def test_agent_policy(self, state_dict):
+        agent = Agent()
+        agent.model.load_state_dict(state_dict)
+        agent.n_games = 1000  # no exploration
+        states = parity_states(11)
+        expected = agent.get_actions(states)
+        agent.policy = NumpyQNet.from_state_dict(state_dict)
+        assert np.array_equal(agent.get_actions(states), expected)
@@ -0,0 +1,101 @@
+import numpy as np
+from features import extract_features, game_features, reachable_features, ReachabilityCache, DIRECTION_INDEX
+from game import SnakeGameAI, Point, Direction, BLOCK_SIZE
+from vec_env import VecSnakeGame
+
+
+def reference_state(game):
+    # Agent.get_state as it was written with Points and is_collision
+    head = game.snake[0]
+    point_l = Point(head.x - 20, head.y)
+    point_r = Point(head.x + 20, head.y)
+    point_u = Point(head.x, head.y - 20)
+    point_d = Point(head.x, head.y + 20)
+    dir_l = game.direction == Direction.LEFT
+    dir_r = game.direction == Direction.RIGHT
+    dir_u = game.direction == Direction.UP
+    dir_d = game.direction == Direction.DOWN
+    return np.array([
+        (dir_r and game.is_collision(point_r)) or (dir_l and game.is_collision(point_l)) or
+        (dir_u and game.is_collision(point_u)) or (dir_d and game.is_collision(point_d)),
+        (dir_u and game.is_collision(point_r)) or (dir_d and game.is_collision(point_l)) or
+        (dir_l and game.is_collision(point_u)) or (dir_r and game.is_collision(point_d)),
+        (dir_d and game.is_collision(point_r)) or (dir_u and game.is_collision(point_l)) or
+        (dir_r and game.is_collision(point_u)) or (dir_l and game.is_collision(point_d)),
+        dir_l, dir_r, dir_u, dir_d,
+        game.food.x < game.head.x, game.food.x > game.head.x,
+        game.food.y < game.head.y, game.food.y > game.head.y,
+    ], dtype=int)
+
+
+def random_games(n_steps, seed):
+    # yields a SnakeGameAI after every step of random play
+    rng = np.random.default_rng(seed)
+    game = SnakeGameAI(w=160, h=120, headless=True)
+    for _ in range(n_steps):
+        action = [0, 0, 0]
+        action[rng.choice(3, p=[0.6, 0.2, 0.2])] = 1
+        _, done, _ = game.play_step(action)
+        yield game
+        if done:
+            game.reset()
+
+
+class TestGameFeatures:
+    def test_matches_reference(self):
+        out = np.empty(11, dtype=np.float32)
+        for game in random_games(2000, seed=0):
+            assert np.array_equal(game_features(game, out), reference_state(game))
+
+    def test_writes_into_out(self):
+        game = SnakeGameAI(w=160, h=120, headless=True)
+        out = np.zeros(11, dtype=np.float32)
+        assert game_features(game, out) is out
+        assert out[4] == 1  # moving right
+
+
+class TestExtractFeatures:
+    def test_matches_single_game(self):
+        batch = [(np.frombuffer(g.grid, dtype=np.uint8).reshape(g.rows, g.cols).copy(),
+                  (int(g.head.x // BLOCK_SIZE), int(g.head.y // BLOCK_SIZE)),
+                  DIRECTION_INDEX[g.direction],
+                  (g.food.x // BLOCK_SIZE, g.food.y // BLOCK_SIZE),
+                  game_features(g)) for g in random_games(300, seed=1)]
+        occupancy, heads, directions, food, expected = (np.array(column) for column in zip(*batch))
+        out = np.empty((len(batch), 11), dtype=np.float32)
+        assert extract_features(occupancy, heads, directions, food, out) is out
+        assert np.array_equal(out, expected)
+
+    def test_vec_env(self):
+        env = VecSnakeGame(16, w=160, h=120, seed=0)
+        out = np.empty((16, 11), dtype=np.float32)
+        rng = np.random.default_rng(0)
+        for _ in range(50):
+            env.step(rng.integers(0, 3, 16))
+            extract_features(env.occupancy, env.heads, env.directions, env.food, out)
+            assert out[:, 3:7].sum(axis=1).tolist() == [1] * 16
+
+
+class TestReachableFeatures:
+    def test_open_board(self):
+        game = SnakeGameAI(w=160, h=120, headless=True)
+        assert reachable_features(game).tolist() == [1, 1, 1, 1, 1, 1]
+
+    def test_split_board(self):
+        # 5 x 5 board cut in two by the snake, heading down into the bottom wall
+        game = SnakeGameAI(w=100, h=100, headless=True)
+        game.set_snake([Point(x * BLOCK_SIZE, y * BLOCK_SIZE) for x, y in [(2, 4), (2, 3), (2, 2), (2, 1), (2, 0), (3, 0)]],
+                       Direction.DOWN)
+        out = reachable_features(game)
+        assert np.allclose(out[:3], [0, 10 / 19, 9 / 19])
+        assert out[3:].tolist() == [0, 0, 1]
+
+    def test_cache(self):
+        game = SnakeGameAI(w=160, h=120, headless=True)
+        cache = ReachabilityCache(maxsize=1)
+        first = reachable_features(game, cache=cache).copy()
+        assert np.array_equal(reachable_features(game, cache=cache), first)
+        assert (cache.hits, cache.misses) == (1, 1)
+        game.play_step([1, 0, 0])
+        reachable_features(game, cache=cache)
+        assert len(cache.entries) == 1
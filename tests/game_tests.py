@@ -0,0 +1,153 @@
+import pytest
+from game import SnakeGameAI, Point, Direction, BLOCK_SIZE, ATE_FOOD, HIT_WALL
+
+STRAIGHT = [1, 0, 0]
+RIGHT = [0, 1, 0]
+LEFT = [0, 0, 1]
+
+
+class RecordingObserver:
+    def __init__(self):
+        self.resets = 0
+        self.steps = 0
+
+    def on_reset(self, game):
+        self.resets += 1
+
+    def on_step(self, game):
+        self.steps += 1
+
+
+class TestHeadless:
+    def test_no_renderer(self, game):
+        assert game.headless
+        assert game.renderer is None
+        assert game.read_input() == (False, False, False)
+
+    def test_step_moves_head(self, game):
+        game.food = Point(0, 0)
+        reward, done, score = game.play_step(STRAIGHT)
+        assert (reward, done, score) == (0, False, 0)
+        assert game.head == Point(120, 100)
+        assert len(game.snake) == 3
+
+    def test_eat_food(self, game):
+        game.food = Point(game.head.x + BLOCK_SIZE, game.head.y)
+        reward, done, score = game.play_step(STRAIGHT)
+        assert (reward, done, score) == (ATE_FOOD, False, 1)
+        assert len(game.snake) == 4
+        assert game.food not in game.snake
+
+    def test_hit_wall(self, game):
+        game.food = Point(0, 0)
+        for _ in range(4):
+            reward, done, _ = game.play_step(STRAIGHT)
+            assert not done
+        reward, done, _ = game.play_step(STRAIGHT)
+        assert (reward, done) == (HIT_WALL, True)
+        assert game.death == 'wall'
+
+    def test_timeout(self, game):
+        game.food = Point(0, 0)
+        game.frame_iterations = 100 * 4  # the head is counted before the tail moves
+        reward, done, _ = game.play_step(RIGHT)
+        assert (reward, done, game.death) == (HIT_WALL, True, 'timeout')
+
+    def test_reward_table(self):
+        game = SnakeGameAI(w=200, h=200, headless=True, rewards={'wall': -50, 'step': -0.5, 'food': 3})
+        game.food = Point(game.head.x + BLOCK_SIZE, game.head.y)
+        assert game.play_step(STRAIGHT)[0] == 3
+        game.food = Point(0, 0)
+        assert game.play_step(STRAIGHT)[0] == -0.5
+        for _ in range(2):
+            game.play_step(STRAIGHT)
+        assert game.play_step(STRAIGHT)[:2] == (-50, True)
+        with pytest.raises(ValueError):
+            SnakeGameAI(w=200, h=200, headless=True, rewards={'looping': -1})
+
+    def test_turns(self, game):
+        game.food = Point(0, 0)
+        game.play_step(RIGHT)
+        assert game.direction == Direction.DOWN
+        game.play_step(LEFT)
+        assert game.direction == Direction.RIGHT
+
+    def test_observers(self, game):
+        obs = RecordingObserver()
+        game.attach(obs)
+        game.attach(obs)
+        game.food = Point(0, 0)
+        game.play_step(STRAIGHT)
+        game.reset()
+        assert (obs.resets, obs.steps) == (1, 1)
+        game.detach(obs)
+        game.reset()
+        assert obs.resets == 1
+
+
+class TestCollision:
+    def test_grid_tracks_body(self, game):
+        game.food = Point(0, 0)
+        for action in (STRAIGHT, RIGHT, RIGHT):
+            game.play_step(action)
+        assert sum(game.grid) == len(game.snake) == 3
+        for pt in game.snake:
+            assert game.grid[game._cell(pt)] == 1
+
+    def test_body_and_walls(self, game):
+        head = game.snake[0]
+        assert not game.is_collision()
+        assert game.is_collision(game.snake[1])
+        assert game.is_collision(Point(-BLOCK_SIZE, head.y))
+        assert game.is_collision(Point(head.x, game.h))
+        assert not game.is_collision(Point(head.x, head.y + BLOCK_SIZE))
+
+    def test_hit_self(self, game):
+        # the new head is checked before the tail moves, so chasing the tail is fatal
+        game.food = Point(game.head.x + BLOCK_SIZE, game.head.y)
+        game.play_step(STRAIGHT)  # grow to 4
+        game.food = Point(0, 0)
+        for action in (RIGHT, RIGHT):
+            _, done, _ = game.play_step(action)
+            assert not done
+        reward, done, _ = game.play_step(RIGHT)
+        assert (reward, done) == (HIT_WALL, True)
+        assert game.death == 'self'
+
+
+class TestFoodPlacement:
+    def test_free_cells_track_grid(self):
+        game = SnakeGameAI(w=200, h=200, headless=True)
+        for i in range(500):
+            action = [STRAIGHT, RIGHT, LEFT][i % 7 % 3]
+            _, done, _ = game.play_step(action)
+            if done:
+                game.reset()
+            free = sorted(c for c in range(game.cols * game.rows) if game.grid[c] == 0)
+            assert sorted(game._free) == free
+            assert game.grid[game._cell(game.food)] == 0
+
+    def test_full_board(self):
+        game = SnakeGameAI(w=80, h=40, headless=True)  # 4 x 2 board, snake on the bottom row
+        path = [(STRAIGHT, (60, 20)), (LEFT, (60, 0)), (LEFT, (40, 0)), (STRAIGHT, (20, 0)), (STRAIGHT, (0, 0))]
+        for action, food in path:
+            game.food = Point(*food)
+            reward, done, score = game.play_step(action)
+        assert (reward, done, score) == (ATE_FOOD, True, 5)
+        assert game.board_full
+        assert game.death == 'won'
+
+    def test_seeded_food(self):
+        def foods(game):
+            placed = []
+            for _ in range(50):
+                game._place_food()
+                placed.append(game.food)
+            return placed
+
+        game = SnakeGameAI(w=200, h=200, headless=True, seed=3)
+        first = foods(game)
+        assert foods(SnakeGameAI(w=200, h=200, headless=True, seed=3)) == first
+        game.reset(seed=3)
+        assert foods(game) == first
+        assert game.death is None
@@ -0,0 +1,31 @@
+import os
+import subprocess
+import sys
+
+import pytest
+
+SOURCE = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'source')
+HEAVY = ['pygame', 'matplotlib', 'IPython']
+
+
+def loaded_after(statement):
+    """Modules of HEAVY that a fresh interpreter has loaded after running ``statement``."""
+    code = f'import sys; {statement}; print(",".join(m for m in {HEAVY!r} if m in sys.modules))'
+    out = subprocess.run([sys.executable, '-c', code], cwd=SOURCE, capture_output=True, text=True, check=True)
+    return [m for m in out.stdout.strip().split(',') if m]
+
+
+@pytest.mark.parametrize('statement', [
+    'import game',
+    'import agent',
+    'import actor_learner',
+    'from game import SnakeGameAI; SnakeGameAI(headless=True).play_step([1, 0, 0])',
+])
+def test_no_heavy_imports(statement):
+    assert loaded_after(statement) == []
+
+
+def test_game_does_not_import_numpy():
+    code = 'import sys, game; print("numpy" in sys.modules)'
+    out = subprocess.run([sys.executable, '-c', code], cwd=SOURCE, capture_output=True, text=True, check=True)
+    assert out.stdout.strip() == 'False'
@@ -0,0 +1,54 @@
+import json
+
+import pytest
+from helper import Series, read_rows
+from metrics import Metrics, MetricsLog
+
+
+class TestMetrics:
+    def test_rolling_aggregates(self):
+        metrics = Metrics(window=3, history=4)
+        rows = [metrics.add(score) for score in [1, 5, 0, 2, 4]]
+        assert [r['game'] for r in rows] == [1, 2, 3, 4, 5]
+        assert rows[-1]['mean'] == pytest.approx(12 / 5)
+        assert rows[-1]['rolling_mean'] == pytest.approx(2.0)
+        assert rows[-1]['record'] == 5
+        assert list(metrics.recent) == [5, 0, 2, 4]
+
+    def test_state_round_trip(self):
+        metrics = Metrics(window=2)
+        for score in [3, 1, 7]:
+            metrics.add(score)
+        restored = Metrics(window=2)
+        restored.load_state(metrics.state())
+        expected = metrics.add(2)
+        row = restored.add(2)
+        assert row.pop('time') == pytest.approx(expected.pop('time'), abs=1)
+        assert row == expected
+
+
+class TestMetricsLog:
+    def test_tail_complete_lines(self, tmp_path):
+        path = tmp_path / 'metrics.jsonl'
+        log = MetricsLog(str(path))
+        log.write({'game': 1, 'score': 3})
+        with open(path) as f:
+            assert read_rows(f) == [{'game': 1, 'score': 3}]
+            with open(path, 'a') as writer:
+                writer.write(json.dumps({'game': 2, 'score': 0})[:5])
+            assert read_rows(f) == []  # half written
+            with open(path, 'a') as writer:
+                writer.write(json.dumps({'game': 2, 'score': 0})[5:] + '\n')
+            assert read_rows(f) == [{'game': 2, 'score': 0}]
+        log.close()
+
+
+class TestSeries:
+    def test_thins_to_max_points(self):
+        series = Series(max_points=10)
+        for i in range(1000):
+            series.append(i, i)
+        assert len(series.x) <= 10
+        steps = {b - a for a, b in zip(series.x, series.x[1:])}
+        assert steps == {series.stride}
+        assert series.x[0] == 0
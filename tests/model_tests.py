@@ -0,0 +1,56 @@
+import copy
+
+import numpy as np
+import pytest
+import torch
+from model import Linear_QNet, QTrainer
+
+
+def reference_step(trainer, state, action, reward, next_state, done):
+    # per-sample Bellman targets, as train_step computed them before batching
+    state = torch.tensor(np.asarray(state), dtype=torch.float)
+    next_state = torch.tensor(np.asarray(next_state), dtype=torch.float)
+    pred = trainer.model(state)
+    target = pred.detach().clone()
+    for idx in range(len(done)):
+        q_new = reward[idx]
+        if not done[idx]:
+            with torch.no_grad():
+                q_new = reward[idx] + trainer.gamma * torch.max(trainer.model(next_state[idx]))
+        target[idx][int(np.argmax(action[idx]))] = q_new
+    trainer.optimizer.zero_grad()
+    trainer.criterion(target, pred).backward()
+    trainer.optimizer.step()
+
+
+class TestQTrainer:
+    @pytest.fixture()
+    def batch(self):
+        rng = np.random.default_rng(0)
+        n = 64
+        states = tuple(rng.integers(0, 2, 11) for _ in range(n))
+        next_states = tuple(rng.integers(0, 2, 11) for _ in range(n))
+        actions = tuple(list(np.eye(3, dtype=int)[rng.integers(0, 3)]) for _ in range(n))
+        rewards = tuple(int(r) for r in rng.choice([0, 10, -9], n))
+        dones = tuple(bool(d) for d in rng.random(n) < 0.2)
+        yield states, actions, rewards, next_states, dones
+
+    def test_matches_per_sample_targets(self, batch):
+        torch.manual_seed(0)
+        model = Linear_QNet(11, 32, 3)
+        ref_model = copy.deepcopy(model)
+        trainer = QTrainer(model, lr=0.001, gamma=0.9)
+        ref_trainer = QTrainer(ref_model, lr=0.001, gamma=0.9)
+
+        trainer.train_step(*batch)
+        reference_step(ref_trainer, *batch)
+        for p, ref_p in zip(model.parameters(), ref_model.parameters()):
+            assert torch.allclose(p, ref_p, atol=1e-6)
+
+    def test_single_sample(self, batch):
+        model = Linear_QNet(11, 32, 3)
+        trainer = QTrainer(model, lr=0.001, gamma=0.9)
+        before = [p.clone() for p in model.parameters()]
+        states, actions, rewards, next_states, dones = batch
+        trainer.train_step(states[0], actions[0], rewards[0], next_states[0], dones[0])
+        assert any(not torch.equal(b, p) for b, p in zip(before, model.parameters()))
@@ -0,0 +1,65 @@
+import json
+import time
+
+from profiler import NULL_PROFILER, Profiler
+
+
+class TestProfiler:
+    def test_null_profiler_is_inert(self):
+        with NULL_PROFILER.phase('play_step'):
+            pass
+        NULL_PROFILER.count('steps')
+        NULL_PROFILER.tick()
+        NULL_PROFILER.close()
+
+    def test_phases_and_rates(self, tmp_path):
+        path = tmp_path / 'profile.jsonl'
+        prof = Profiler(str(path), verbose=False)
+        for _ in range(10):
+            with prof.phase('sleep'):
+                time.sleep(0.001)
+            with prof.phase('fast'):
+                pass
+            prof.count('steps')
+        record = prof.emit()
+        prof.close()  # nothing new to write
+
+        sleep = record['phases']['sleep']
+        assert sleep['count'] == 10
+        assert 1000 <= sleep['p50_us'] <= sleep['p99_us'] <= sleep['max_us']
+        assert record['phases']['fast']['p99_us'] < sleep['p50_us']
+        assert record['counters'] == {'steps': 10}
+        assert record['rates']['steps_per_sec'] > 0
+        lines = path.read_text().splitlines()
+        assert len(lines) == 1
+        assert json.loads(lines[0])['phases']['sleep']['count'] == 10
+
+    def test_emit_starts_new_interval(self):
+        prof = Profiler(verbose=False)
+        with prof.phase('a'):
+            pass
+        prof.count('steps', 3)
+        prof.emit()
+        record = prof.emit()
+        assert record['phases'] == {}
+        assert record['counters'] == {'steps': 0}
+
+    def test_tick_emits_after_interval(self, tmp_path):
+        path = tmp_path / 'profile.jsonl'
+        prof = Profiler(str(path), interval=0.0, verbose=False)
+        prof.count('steps')
+        prof.tick()
+        assert len(path.read_text().splitlines()) == 1
+
+    def test_sampled_phases(self):
+        prof = Profiler(verbose=False, sample_every=4)
+        for _ in range(40):
+            prof.tick()
+            with prof.phase('step'):
+                time.sleep(0.0005)
+            prof.count('steps')
+        record = prof.emit()
+        step = record['phases']['step']
+        assert step['count'] == 10
+        assert record['counters'] == {'steps': 40}
+        assert step['total_ms'] >= 40 * 0.5  # scaled up to every call
@@ -0,0 +1,57 @@
+import numpy as np
+import pytest
+import torch
+import torch.multiprocessing as mp
+
+from agent import Agent
+from qtable import ALL_STATES, QTable, state_index
+
+
+def fill(table, action):
+    table.actions[:] = action
+
+
+class TestQTable:
+    def test_state_index(self):
+        assert np.array_equal(state_index(ALL_STATES), np.arange(2048))
+        state = np.zeros(11, dtype=np.float32)
+        state[[0, 3, 10]] = 1
+        assert state_index(state[None])[0] == 1 + 8 + 1024
+
+    def test_matches_model(self, model):
+        table = QTable()
+        table.refresh(model)
+        states = np.random.default_rng(0).integers(0, 2, (500, 11)).astype(np.float32)
+        with torch.no_grad():
+            expected = model(torch.from_numpy(states)).numpy()
+        assert np.allclose(table.q_values(states), expected, atol=1e-6)
+        assert [table.act(s) for s in states] == expected.argmax(axis=1).tolist()
+
+    def test_shared_with_spawned_process(self):
+        table = QTable()
+        p = mp.get_context('spawn').Process(target=fill, args=(table, 2))
+        p.start()
+        p.join(timeout=60)
+        assert p.exitcode == 0
+        assert (table.actions == 2).all()
+
+
+class TestAgentQTable:
+    def test_refresh_every(self):
+        agent = Agent(q_table_every=3)
+        agent.n_games = 1000  # no exploration
+        states = ALL_STATES[:4]
+        agent.get_actions(states)
+        assert agent._table_updates == 0
+        state = np.zeros(11, dtype=np.float32)
+        for i in range(3):
+            agent.train_short_memory(state, [1, 0, 0], 1.0, state, False)
+            agent.get_actions(states)
+            assert agent._table_updates == (3 if i == 2 else 0)
+        with torch.no_grad():
+            expected = agent.model(torch.from_numpy(ALL_STATES)).argmax(dim=1).numpy()
+        assert np.array_equal(agent.get_actions(ALL_STATES), expected)
+
+    def test_extended_state_rejected(self):
+        with pytest.raises(ValueError):
+            Agent(extended_state=True, q_table_every=10)
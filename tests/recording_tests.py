@@ -0,0 +1,84 @@
+import random
+
+import numpy as np
+import pytest
+from game import SnakeGameAI
+from recording import (MAGIC, Episode, EpisodeRecorder, EpisodeWriter, pack_actions, read_episodes, replay,
+                       unpack_actions)
+
+ACTIONS = [[1, 0, 0], [0, 1, 0], [0, 0, 1]]
+
+
+def play(seed, rng):
+    """A game with random moves, mostly straight, recorded as it is played."""
+    game = SnakeGameAI(w=160, h=120, headless=True, seed=seed)
+    recorder = EpisodeRecorder()
+    recorder.start(seed, game.w, game.h)
+    done = False
+    while not done:
+        action = ACTIONS[rng.choice([0, 0, 0, 1, 2])]
+        _, done, score = game.play_step(action)
+        recorder.step(action)
+    return game, recorder.finish(score)
+
+
+class TestPacking:
+    @pytest.mark.parametrize('steps', [0, 1, 3, 4, 5, 1001])
+    def test_round_trip(self, steps):
+        actions = np.random.default_rng(steps).integers(0, 3, steps).astype(np.uint8)
+        data = pack_actions(actions)
+        assert len(data) == -(-steps // 4)
+        assert np.array_equal(unpack_actions(data, steps), actions)
+
+
+class TestRecording:
+    def test_action_forms(self):
+        recorder = EpisodeRecorder()
+        recorder.start(0, 160, 120)
+        actions = np.array([2, 0, 1])  # as from Agent.get_actions or VecSnakeGame
+        for action in (*actions, 1, [0, 0, 1], np.array([1, 0, 0])):
+            recorder.step(action)
+        assert recorder.finish(0).actions.tolist() == [2, 0, 1, 1, 2, 0]
+
+    def test_file_round_trip(self, tmp_path):
+        path = str(tmp_path / 'episodes.bin')
+        rng = random.Random(0)
+        episodes = [play(seed, rng)[1] for seed in range(5)]
+        writer = EpisodeWriter(path)
+        for episode in episodes[:3]:
+            writer.write(episode)
+        writer.close()
+        writer = EpisodeWriter(path)  # appends after the existing episodes
+        for episode in episodes[3:]:
+            writer.write(episode)
+        writer.close()
+
+        read = list(read_episodes(path))
+        assert len(read) == 5
+        for got, expected in zip(read, episodes):
+            assert got[:4] == expected[:4]
+            assert np.array_equal(got.actions, expected.actions)
+
+    def test_cut_off_episode_is_skipped(self, tmp_path):
+        path = tmp_path / 'episodes.bin'
+        writer = EpisodeWriter(str(path))
+        writer.write(Episode(1, 160, 120, 0, np.zeros(10, dtype=np.uint8)))
+        writer.write(Episode(2, 160, 120, 0, np.zeros(10, dtype=np.uint8)))
+        writer.close()
+        path.write_bytes(path.read_bytes()[:-1])
+        assert [e.seed for e in read_episodes(str(path))] == [1]
+
+    def test_not_a_recording(self, tmp_path):
+        path = tmp_path / 'other.bin'
+        path.write_bytes(b'x' * len(MAGIC))
+        with pytest.raises(ValueError):
+            list(read_episodes(str(path)))
+
+    def test_replay_is_deterministic(self):
+        rng = random.Random(1)
+        for seed in range(20):
+            game, episode = play(seed, rng)
+            replayed = replay(episode)
+            assert (replayed.score, replayed.death, replayed.frame_iterations) == \
+                   (game.score, game.death, game.frame_iterations)
+            assert list(replayed.snake) == list(game.snake)
@@ -0,0 +1,62 @@
+import os
+import random
+
+import pytest
+
+os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+pygame = pytest.importorskip('pygame')
+
+from game import SnakeGameAI  # noqa: E402
+
+ACTIONS = [[1, 0, 0], [0, 1, 0], [0, 0, 1]]
+
+
+@pytest.fixture()
+def game(monkeypatch, tmp_path):
+    monkeypatch.chdir(tmp_path)  # fonts are found from any working directory
+    game = SnakeGameAI(w=200, h=160)
+    yield game
+    pygame.quit()
+
+
+def full_frame(renderer):
+    renderer._stale = True
+    renderer._update_ui()
+    return pygame.image.tobytes(renderer.display, 'RGB')
+
+
+class TestGameRenderer:
+    def test_incremental_frames_match_full_redraw(self, game):
+        renderer = game.renderer
+        random.seed(3)
+        renderer.update_plot_data([0, 3, 1])
+        frames = 0
+        while frames < 300:
+            reward, done, score = game.play_step(random.choice(ACTIONS))
+            if done:
+                game.reset()
+                continue
+            frames += 1
+            incremental = pygame.image.tobytes(renderer.display, 'RGB')
+            assert incremental == full_frame(renderer)
+
+    def test_high_score_window(self, game):
+        renderer = game.renderer
+        width = renderer.plot_width
+        scores = [5, 2, 5, 1] + [0] * (width - 4)
+        renderer.update_plot_data(scores)
+        assert renderer.calc_high_score() == (2, 5)  # ties go to the latest game
+        scores += [3]
+        renderer.update_plot_data(scores)
+        assert list(renderer.plot_data) == scores[-width:]
+        assert renderer.calc_high_score() == (1, 5)
+        scores += [0, 0, 0]
+        renderer.update_plot_data(scores)
+        assert renderer.calc_high_score() == (width - 4, 3)
+
+    def test_plot_restarts_for_shorter_history(self, game):
+        renderer = game.renderer
+        renderer.update_plot_data([4, 8, 1])
+        renderer.update_plot_data([2])
+        assert list(renderer.plot_data) == [2]
+        assert renderer.calc_high_score() == (0, 2)
@@ -0,0 +1,151 @@
+import numpy as np
+import pytest
+import torch
+from model import Linear_QNet, QTrainer
+from replay import MemmapReplayMemory, PrioritizedReplayMemory, ReplayMemory, SharedReplayMemory, SumTree
+
+
+def push_n(memory, n, start=0):
+    for i in range(start, start + n):
+        state = np.full(11, i)
+        memory.push(state, [0, 0, 1] if i % 2 else [1, 0, 0], i, state + 1, i % 5 == 0)
+
+
+class TestReplayMemory:
+    @pytest.fixture()
+    def memory(self) -> ReplayMemory:
+        yield ReplayMemory(100, 11, seed=0)
+
+    def test_push(self, memory):
+        push_n(memory, 3)
+        assert len(memory) == 3
+        assert memory.actions[:3].tolist() == [0, 2, 0]
+        assert memory.dones[:3].tolist() == [True, False, False]
+        assert memory.next_states[2, 0] == 3
+
+    def test_ring_overwrites_oldest(self, memory):
+        push_n(memory, 150)
+        assert len(memory) == 100
+        assert memory.position == 50
+        assert sorted(memory.rewards.tolist()) == list(range(50, 150))
+
+    def test_sample_whole_memory_when_small(self, memory):
+        push_n(memory, 10)
+        states, actions, rewards, next_states, dones = memory.sample(32)
+        assert states.shape == (10, 11)
+        assert rewards.tolist() == list(range(10))
+
+    def test_sample_without_replacement(self, memory):
+        push_n(memory, 100)
+        states, actions, rewards, next_states, dones = memory.sample(32)
+        assert states.shape == (32, 11) and states.dtype == torch.float
+        assert len(set(rewards.tolist())) == 32
+        assert torch.equal(next_states, states + 1)
+
+    def test_batch_shares_buffer(self, memory):
+        push_n(memory, 100)
+        states, *_ = memory.sample(32)
+        assert states.data_ptr() == memory._batch[0].ctypes.data
+
+    def test_feeds_trainer(self, memory):
+        push_n(memory, 100)
+        trainer = QTrainer(Linear_QNet(11, 16, 3), lr=0.001, gamma=0.9)
+        trainer.train_step(*memory.sample(32))
+
+
+class TestSumTree:
+    def test_total_and_update(self):
+        tree = SumTree(5)
+        tree.update([0, 1, 2, 3, 4], [1.0, 2.0, 3.0, 4.0, 0.0])
+        assert tree.total == 10.0
+        tree.set(4, 5.0)
+        tree.update([0, 0], [3.0, 3.0])  # duplicate indices
+        assert tree.total == 17.0
+
+    def test_find(self):
+        tree = SumTree(4)
+        tree.update([0, 1, 2, 3], [1.0, 0.0, 2.0, 1.0])
+        assert tree.find([0.0, 0.99, 1.0, 2.5, 3.0, 3.99]).tolist() == [0, 0, 2, 2, 3, 3]
+
+
+class TestPrioritizedReplayMemory:
+    @pytest.fixture()
+    def memory(self) -> PrioritizedReplayMemory:
+        memory = PrioritizedReplayMemory(64, 11, seed=0)
+        push_n(memory, 64)
+        yield memory
+
+    def test_sample(self, memory):
+        states, actions, rewards, next_states, dones, idx, weights = memory.sample(16)
+        assert states.shape == (16, 11)
+        assert torch.equal(rewards, torch.from_numpy(idx.astype(np.float32)))
+        assert torch.allclose(weights, torch.ones(16))  # equal priorities
+
+    def test_priorities_bias_sampling(self, memory):
+        td_errors = np.zeros(64)
+        td_errors[7] = 1000.0
+        memory.update_priorities(np.arange(64), td_errors)
+        *_, idx, weights = memory.sample(16)
+        assert (idx == 7).sum() > 8
+
+    def test_trainer_feedback(self, memory):
+        trainer = QTrainer(Linear_QNet(11, 16, 3), lr=0.001, gamma=0.9)
+        states, actions, rewards, next_states, dones, idx, weights = memory.sample(16)
+        td_errors = trainer.train_step(states, actions, rewards, next_states, dones, weights)
+        assert td_errors.shape == (16,)
+        memory.update_priorities(idx, td_errors)
+        assert memory.tree.total > 0
+
+
+def fill_shard(memory, shard, n):
+    memory.shard = shard
+    push_n(memory, n, start=shard * 1000)
+
+
+class TestSharedReplayMemory:
+    def test_shards_ring_independently(self):
+        memory = SharedReplayMemory(10, 11, shards=2, seed=0)
+        fill_shard(memory, 1, 7)
+        fill_shard(memory, 0, 2)
+        assert len(memory) == 7
+        rewards = sorted(memory.sample(100)[2].tolist())
+        assert rewards == [0, 1, 1002, 1003, 1004, 1005, 1006]
+
+    def test_child_process_writes_are_visible(self):
+        memory = SharedReplayMemory(100, 11, shards=2, seed=0)
+        ctx = torch.multiprocessing.get_context('spawn')
+        p = ctx.Process(target=fill_shard, args=(memory, 1, 5))
+        p.start()
+        p.join()
+        assert p.exitcode == 0
+        assert len(memory) == 5
+        assert memory.rewards[50:55].tolist() == [1000, 1001, 1002, 1003, 1004]
+
+
+class TestMemmapReplayMemory:
+    def test_persists_across_reopen(self, tmp_path):
+        memory = MemmapReplayMemory(str(tmp_path), 100, 11, seed=0)
+        push_n(memory, 30)
+        memory.flush()
+        del memory
+
+        reopened = MemmapReplayMemory(str(tmp_path), seed=0)
+        assert (reopened.capacity, reopened.state_dim, len(reopened), reopened.position) == (100, 11, 30, 30)
+        push_n(reopened, 80, start=30)
+        assert (len(reopened), reopened.position) == (100, 10)
+        states, actions, rewards, next_states, dones = reopened.sample(16)
+        assert torch.equal(next_states, states + 1)
+
+    def test_reader_sees_writes(self, tmp_path):
+        writer = MemmapReplayMemory(str(tmp_path), 50, 11)
+        reader = MemmapReplayMemory(str(tmp_path), mode='r')
+        push_n(writer, 5)
+        assert len(reader) == 5
+        assert sorted(reader.sample(10)[2].tolist()) == [0, 1, 2, 3, 4]
+
+    def test_shape_mismatch(self, tmp_path):
+        MemmapReplayMemory(str(tmp_path), 50, 11)
+        with pytest.raises(ValueError):
+            MemmapReplayMemory(str(tmp_path), 50, 17)
+        with pytest.raises(FileNotFoundError):
+            MemmapReplayMemory(str(tmp_path / 'missing'), mode='r')
@@ -0,0 +1,109 @@
+import queue
+import random
+
+import numpy as np
+import pytest
+from game import BLOCK_SIZE, CLOCK_WISE, Point, SnakeGameAI
+from spectator import Spectator, game_body, replay_frames, vec_body
+from vec_env import VecSnakeGame
+
+ACTIONS = [[1, 0, 0], [0, 1, 0], [0, 0, 1]]
+DELTAS = [(BLOCK_SIZE, 0), (0, BLOCK_SIZE), (-BLOCK_SIZE, 0), (0, -BLOCK_SIZE)]
+
+
+def greedy_action(game):
+    """Safe move that gets closest to the food, so test games eat a few times."""
+    d = CLOCK_WISE.index(game.direction)
+    best = None
+    for action, turn in zip(ACTIONS, (0, 1, -1)):
+        dx, dy = DELTAS[(d + turn) % 4]
+        pt = Point(game.head.x + dx, game.head.y + dy)
+        distance = abs(pt.x - game.food.x) + abs(pt.y - game.food.y)
+        if not game.is_collision(pt) and (best is None or distance < best[0]):
+            best = distance, action
+    return ACTIONS[0] if best is None else best[1]
+
+
+def drain(q):
+    messages = []
+    while True:
+        try:
+            messages.append(q.get_nowait())
+        except queue.Empty:
+            return messages
+
+
+@pytest.fixture()
+def game():
+    random.seed(7)
+    yield SnakeGameAI(w=160, h=120, headless=True)
+
+
+class TestSpectator:
+    def test_frames_every_k_steps(self, game):
+        q = queue.Queue()
+        game.attach(Spectator(q, every=5, replay_records=False))
+        game.reset()
+        for _ in range(12):
+            game.play_step(greedy_action(game))
+        frames = [m for m in drain(q) if m[0] == 'frame']
+        assert len(frames) == 2
+        for _, cols, rows, body, food, score in frames:
+            assert (cols, rows) == (game.cols, game.rows)
+            assert len(body) >= 3
+
+    def test_full_queue_never_blocks(self, game):
+        q = queue.Queue(maxsize=1)
+        spectator = Spectator(q, every=1)
+        game.attach(spectator)
+        game.reset()
+        game.play_step(greedy_action(game))
+        game.play_step(greedy_action(game))
+        assert q.qsize() == 1
+        assert spectator.dropped == 1
+
+    def test_record_replay_matches_game(self, game):
+        q = queue.Queue()
+        game.attach(Spectator(q, every=10 ** 9))
+        game.reset()
+        frames = []
+        done = False
+        while not done:
+            reward, done, score = game.play_step(greedy_action(game))
+            if not done:
+                frames.append((list(game_body(game)), game._cell(game.food), game.score))
+        game.reset()
+        assert score > 0
+        replays = [m for m in drain(q) if m[0] == 'replay']
+        assert len(replays) == 1
+        _, cols, rows, body, food, moves, record = replays[0]
+        assert record == score
+        assert [(list(b), f, s) for b, f, s in replay_frames(body, food, moves)] == frames
+
+
+class TestVecSpectator:
+    def test_follows_one_env(self):
+        env = VecSnakeGame(4, w=160, h=120, seed=0)
+        rng = np.random.default_rng(0)
+        q = queue.Queue()
+        spectator = Spectator(q, every=1)
+        spectator.vec_step(env, np.zeros(4, dtype=bool), env.score, index=2)
+        starts = [(list(vec_body(env, 2)), int(env.food[2, 1] * env.cols + env.food[2, 0]))]
+        bodies = [[]]
+        for _ in range(300):
+            reward, done, score = env.step(rng.integers(0, 3, 4))
+            spectator.vec_step(env, done, score, index=2)
+            food = int(env.food[2, 1] * env.cols + env.food[2, 0])
+            if done[2]:
+                starts.append((list(vec_body(env, 2)), food))
+                bodies.append([])
+            else:
+                bodies[-1].append((list(vec_body(env, 2)), food, int(env.score[2])))
+        messages = drain(q)
+        frames = [m for m in messages if m[0] == 'frame']
+        assert len(frames) == sum(len(b) for b in bodies)
+        assert [list(f[3]) for f in frames] == [b for episode in bodies for b, _, _ in episode]
+        assert [m[1] for m in messages if m[0] == 'score'] != []
+        for _, cols, rows, body, food, moves, score in (m for m in messages if m[0] == 'replay'):
+            episode = next(i for i, (b, f) in enumerate(starts) if b == list(body) and f == food)
+            assert [(list(b), f, s) for b, f, s in replay_frames(body, food, moves)] == bodies[episode]
@@ -0,0 +1,78 @@
+import csv
+import json
+
+import pytest
+
+from sweep import expand, run_job, sweep
+
+TINY = {'budget': {'steps': 300}, 'eval_episodes': 2, 'size': [200, 200]}
+
+
+class TestExpand:
+    def test_grid(self):
+        jobs = expand({**TINY, 'params': {'lr': [0.01, 0.001], 'rewards.self': [-9, -20, -30]}, 'seeds': [0, 1]})
+        assert len(jobs) == 12
+        assert [job['job'] for job in jobs] == list(range(12))
+        assert {(job['config']['lr'], job['config']['rewards.self'], job['seed']) for job in jobs} == \
+               {(lr, r, s) for lr in (0.01, 0.001) for r in (-9, -20, -30) for s in (0, 1)}
+        assert all(job['max_steps'] == 300 and job['max_seconds'] is None for job in jobs)
+
+    def test_random(self):
+        spec = {**TINY, 'search': 'random', 'samples': 20,
+                'params': {'lr': {'low': 1e-4, 'high': 1e-2, 'log': True}, 'batch_size': {'low': 32, 'high': 512},
+                           'gamma': [0.9, 0.99]}}
+        jobs = expand(spec)
+        assert len(jobs) == 20
+        assert all(1e-4 <= job['config']['lr'] <= 1e-2 for job in jobs)
+        assert all(isinstance(job['config']['batch_size'], int) for job in jobs)
+        assert {job['config']['gamma'] for job in jobs} <= {0.9, 0.99}
+        assert expand(spec) == jobs  # the same configs for the same search seed
+
+    @pytest.mark.parametrize('spec', [
+        {**TINY, 'params': {'learning_rate': [0.1]}},
+        {**TINY, 'params': {'rewards.looping': [-1]}},
+        {**TINY, 'params': {'lr': {'low': 0.1, 'high': 1}}},
+        {**TINY, 'search': 'bayes'},
+        {'budget': {}},
+        {**TINY, 'params': {'extended_state': [True, False], 'q_table_every': [10]}},
+        {**TINY, 'params': {'batch_size': [0]}},
+    ])
+    def test_invalid(self, spec):
+        with pytest.raises(ValueError):
+            expand(spec)
+
+
+class TestRun:
+    def test_run_job(self):
+        job = expand({**TINY, 'params': {'lr': [0.01], 'batch_size': [32], 'rewards.step': [-0.1]}})[0]
+        result = run_job(job)
+        assert result['steps'] == 300
+        assert result['games'] == len(result['curve'])
+        assert all(steps <= 300 for steps, _ in result['curve'])
+        assert result['eval']['min'] <= result['eval']['mean'] <= result['eval']['max']
+        assert run_job(job)['curve'] == result['curve']  # seeded
+
+    def test_sweep_writes_table(self, tmp_path):
+        spec = {**TINY, 'params': {'gamma': [0.8, 0.9]}}
+        rows = sweep(spec, str(tmp_path), workers=2, save_models=True)
+        assert sorted(row['job'] for row in rows) == [0, 1]
+        assert rows[0]['eval_mean'] >= rows[1]['eval_mean']
+        with open(tmp_path / 'results.csv') as f:
+            table = list(csv.DictReader(f))
+        assert [int(row['job']) for row in table] == [row['job'] for row in rows]
+        with open(tmp_path / 'results.jsonl') as f:
+            results = [json.loads(line) for line in f]
+        assert all('curve' in result for result in results)
+        assert (tmp_path / 'job-0001.pth').exists()
+
+    def test_failed_job_is_logged(self, tmp_path):
+        spec = {**TINY, 'params': {'lr': [0.01, -1.0]}}  # Adam rejects a negative learning rate
+        rows = sweep(spec, str(tmp_path), workers=2)
+        assert [row['job'] for row in rows] == [0, 1]
+        assert 'error' not in rows[0]
+        assert rows[1]['error'].startswith('ValueError')
+        with open(tmp_path / 'results.csv') as f:
+            table = list(csv.DictReader(f))
+        assert table[1]['error'] == rows[1]['error'] and table[0]['error'] == ''
+        with open(tmp_path / 'results.jsonl') as f:
+            assert sum('error' in json.loads(line) for line in f) == 1
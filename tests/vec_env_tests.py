@@ -0,0 +1,59 @@
+import numpy as np
+import pytest
+from game import SnakeGameAI, Point, BLOCK_SIZE, HIT_WALL
+from vec_env import VecSnakeGame
+
+
+def sync_food(game, env, n=0):
+    game.food = Point(int(env.food[n, 0]) * BLOCK_SIZE, int(env.food[n, 1]) * BLOCK_SIZE)
+
+
+class TestVecSnakeGame:
+    @pytest.fixture()
+    def env(self) -> VecSnakeGame:
+        yield VecSnakeGame(8, w=200, h=160, seed=1)
+
+    def test_reset_state(self, env):
+        assert env.occupancy.reshape(env.n, -1).sum(axis=1).tolist() == [3] * env.n
+        assert (env.heads == (5, 4)).all()
+        for n in range(env.n):
+            assert env.occupancy[n, env.food[n, 1], env.food[n, 0]] == 0
+
+    def test_hit_wall_and_auto_reset(self, env):
+        env.food[:] = (0, 0)
+        for _ in range(4):
+            reward, done, _ = env.step(np.zeros(env.n, dtype=int))
+            assert not done.any()
+        reward, done, score = env.step(np.zeros(env.n, dtype=int))
+        assert done.all()
+        assert (reward == HIT_WALL).all()
+        assert (env.heads == (5, 4)).all()
+        assert (env.length == 3).all()
+
+    def test_matches_snake_game(self):
+        rng = np.random.default_rng(7)
+        for episode in range(20):
+            env = VecSnakeGame(1, w=200, h=160, seed=episode)
+            game = SnakeGameAI(w=200, h=160, headless=True)
+            sync_food(game, env)
+            done = False
+            while not done:
+                action = int(rng.integers(0, 3))
+                one_hot = [0, 0, 0]
+                one_hot[action] = 1
+                g_reward, g_done, g_score = game.play_step(one_hot)
+                reward, done_arr, score = env.step([action])
+                done = bool(done_arr[0])
+                assert (int(reward[0]), done, int(score[0])) == (g_reward, g_done, g_score)
+                if not done:
+                    assert (game.head.x / BLOCK_SIZE, game.head.y / BLOCK_SIZE) == tuple(env.heads[0])
+                    assert int(env.length[0]) == len(game.snake)
+                    sync_food(game, env)
+
+    def test_full_board_is_done(self):
+        env = VecSnakeGame(1, w=80, h=20, seed=0)  # 4 x 1 board
+        # snake fills 3 cells, food must be in the last one
+        assert tuple(env.food[0]) == (3, 0)
+        reward, done, score = env.step([0])
+        assert done[0]
+        assert score[0] == 1